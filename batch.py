@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lib import instrument
+from lib.cache import PathCache, cache_key, pipeline_params
+from lib.skeleton import gen_skel, save_skeleton
+from lib.slicer import slice
+import config
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# Pixels per plotter unit, output bounds are [0, 4] as in main.py
+PLOT_SCALE = 120.0
+
+
+def write_path(path, file_path):
+    """
+    Write a traversal as plotter coordinates, one x,y point per line.
+    """
+
+    with open(file_path, "w") as f:
+        for x, y in path:
+            f.write(f"{x / PLOT_SCALE},{y / PLOT_SCALE}\n")
+
+
+def process_image(file_path, output_dir):
+    """
+    Skeletonize and slice one image, writing its skeleton and path files. Returns
+    the manifest entry for the image. When profiling, a report is written per image.
+    """
+
+    name = os.path.splitext(os.path.basename(file_path))[0]
+
+    if config.profile:
+        instrument.enable(name, memory=config.profile_memory)
+    else:
+        instrument.enable_from_env(name)
+
+    try:
+        return slice_image(file_path, output_dir)
+    finally:
+        report = instrument.disable()
+        if report is not None:
+            instrument.write_report(
+                report, os.path.join(output_dir, f"{name}_profile.json")
+            )
+
+
+def slice_image(file_path, output_dir):
+
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    skeleton_path = os.path.join(output_dir, f"{name}_skel.png")
+    path_path = os.path.join(output_dir, f"{name}_path.txt")
+
+    options = {
+        "compact": config.compact_graph,
+        "search": config.graph_search,
+        "path_graph": config.path_graph,
+        "topology": config.graph_topology,
+        "constructor": config.path_constructor,
+    }
+
+    entry = {"name": name, "input": file_path, "cached": False}
+    timings = {}
+
+    try:
+        cache = None
+        cached = None
+        if config.cache_dir is not None:
+            start = time.perf_counter()
+            cache = PathCache(config.cache_dir, int(config.cache_max_mb * 2**20))
+            key = cache_key(file_path, pipeline_params(**options))
+            cached = cache.get(key)
+            timings["cache"] = time.perf_counter() - start
+
+        if cached is not None:
+            entry["cached"] = True
+            skeleton, path = cached
+            save_skeleton(skeleton, skeleton_path)
+        else:
+            start = time.perf_counter()
+            skeleton = gen_skel(file_path, skeleton_path)
+            timings["skeleton"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            path = slice(skeleton, None, **options)
+            timings["slice"] = time.perf_counter() - start
+
+            if cache is not None:
+                cache.put(key, skeleton, path)
+
+        start = time.perf_counter()
+        write_path(path, path_path)
+        timings["write"] = time.perf_counter() - start
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+        entry["timings"] = timings
+        return entry
+
+    entry.update(
+        {
+            "skeleton": skeleton_path,
+            "path": path_path,
+            "pixels": int(skeleton.sum()),
+            "points": len(path),
+            "timings": timings,
+        }
+    )
+
+    return entry
+
+
+def batch(input_dir, output_dir, workers):
+    """
+    Slice every image in input_dir across a worker pool. Writes a skeleton PNG and
+    path file per image and a manifest.json to output_dir, and returns the manifest.
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    files = [
+        os.path.join(input_dir, name)
+        for name in sorted(os.listdir(input_dir))
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        images = list(executor.map(process_image, files, [output_dir] * len(files)))
+
+    manifest = {
+        "input": input_dir,
+        "workers": workers,
+        "total_s": time.perf_counter() - start,
+        "images": images,
+    }
+
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Skeletonize and slice every image in a directory."
+    )
+    parser.add_argument("input", help="directory of input images")
+    parser.add_argument("-o", "--output", default="output", help="output directory")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="worker processes, defaults to the number of CPUs",
+    )
+    args = parser.parse_args()
+
+    manifest = batch(args.input, args.output, args.workers)
+
+    for image in manifest["images"]:
+        if "error" in image:
+            print(f"{image['name']:24s} failed: {image['error']}")
+        else:
+            print(
+                f"{image['name']:24s} {image['points']:6d} points | "
+                + " | ".join(f"{k} {v:.2f}s" for k, v in image["timings"].items())
+            )
+
+    print(
+        f"{len(manifest['images'])} images in {manifest['total_s']:.2f}s, "
+        f"manifest written to {os.path.join(args.output, 'manifest.json')}"
+    )
+
+
+# Workers re-import this module, so only run the batch when executed
+if __name__ == "__main__":
+    main()
@@ -12,3 +12,73 @@ debug: bool = False
 
 # Delay between frames of sliced path when being displayed
 frame_delay_s: float = 0.001
+
+# Render the sliced path to a file without a display instead of plotting it,
+# animated for .gif or .mp4 and as a single image otherwise. None plots as usual
+render_output: str | None = None
+
+# Points drawn per frame of an animated render
+render_points_per_frame: int = 30
+
+# Store pixel graphs as compact CSR arrays instead of Python sets
+compact_graph: bool = False
+
+# Pixel graph search used between waypoints: "bfs", "bidirectional" or "astar"
+graph_search: str = "bfs"
+
+# Distances between sliced paths: "dense" for every pair, "sparse" for only the
+# pairs needed by the MST, which scales to thousands of paths
+path_graph: str = "dense"
+
+# How each cluster's junctions and branches are found: "walk" follows the pixel
+# graph from its root, "junction" classifies every skeleton pixel at once from its
+# 3x3 neighbourhood, which is faster on large skeletons
+graph_topology: str = "walk"
+
+# How each cluster's subgraph is ordered into a path: "waypoints" searches the pixel
+# graph between waypoints on every edge, "sweep" draws the edges themselves in one
+# pass and only searches where the pen has to jump, "eulerian" draws every edge in
+# one walk that doubles as few edges as it can
+path_constructor: str = "waypoints"
+
+# Worker processes used to slice clusters in parallel, 1 slices them in-process
+slice_workers: int = 1
+
+# Directory caching skeletons and sliced paths by image and pipeline parameters,
+# e.g. "cache", or None to slice every run. Entries are only invalidated by
+# CACHE_VERSION in lib/cache.py, so bump it after changing the slicing code
+cache_dir: str | None = None
+
+# Least recently used cache entries are evicted past this size
+cache_max_mb: float = 64
+
+# Profile each run, also enabled by setting LINUS_PROFILE=1 or LINUS_PROFILE=memory
+profile: bool = False
+
+# Sample peak traced memory of every profiled stage, which slows the run down
+profile_memory: bool = False
+
+# JSON profile report, a flamegraph .folded file is written next to it
+profile_output: str = "output/profile.json"
+
+# Stream points to the plotter as each cluster is sliced, visiting clusters in a
+# cheap centroid order instead of the MST order of the full slice
+stream_slicing: bool = False
+
+# Serial protocol, must match WINDOWED_PROTOCOL in pico/main.c: "text" for one
+# ASCII point per READY handshake, "windowed" for batched binary frames
+serial_protocol: str = "text"
+
+# Send with the asyncio sender, which waits on the port instead of polling and
+# resumes from the last acknowledged point after a reconnect
+serial_async: bool = False
+
+# Simplify the path to within this many plotter units before sending it, None
+# sends every traversal pixel. 0.0025 is 0.3 pixels or about 0.1mm on paper
+simplify_tolerance: float | None = None
+
+# Kinematic model of plot time estimates in plotter units, which are motor
+# revolutions. None for the velocity uses the firmware's fixed step rate, and
+# None for the acceleration moves at that velocity with no ramp, as the Pico does
+plot_max_velocity: float | None = None
+plot_max_acceleration: float | None = None
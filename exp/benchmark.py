@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib import instrument
+from lib.plotter import Plotter
+from lib.skeleton import gen_skel
+from lib.slicer import slice
+
+try:
+    import resource
+except ImportError:  # Peak RSS is only recorded where the platform reports it
+    resource = None
+
+# Relative slowdown past which a timing counts as a regression
+THRESHOLD = 0.20
+
+# Relative growth past which memory, pen travel or plot time counts as a regression
+SIZE_THRESHOLD = 0.05
+
+# Timings below this many seconds are too noisy to flag
+MIN_TIME_S = 0.02
+
+# Metrics where a larger value is worse
+TIME_METRICS = ("wall_s",)
+SIZE_METRICS = ("peak_rss_bytes", "pen_travel", "plot_s", "retrace")
+
+# Plotter units per traversal pixel, as in main.py
+PLOT_SCALE = 1 / 120.0
+
+
+def peak_rss() -> int | None:
+    if resource is None:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def flatten_spans(span: dict, prefix: str = "") -> dict:
+    """
+    Total time of every span below the root, keyed by its path in the call tree.
+    """
+
+    stages = {}
+    for child in span["children"]:
+        name = f"{prefix}/{child['name']}" if prefix else child["name"]
+        stages[name] = child["total_s"]
+        stages.update(flatten_spans(child, name))
+
+    return stages
+
+
+def bench_image(file_path: str, repeat: int) -> dict:
+    """
+    Runs the full pipeline on one image repeat times, keeping the fastest wall
+    time and the fastest time of each stage. Meant to run in a fresh process so
+    peak RSS is its own.
+    """
+
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    output = f"/tmp/benchmark_{name}_skel.png"
+
+    wall = None
+    stages = {}
+    for _ in range(repeat):
+        instrument.enable(name)
+
+        start = time.perf_counter()
+        skeleton = gen_skel(file_path, output)
+        traversal = slice(skeleton, None)
+        elapsed = time.perf_counter() - start
+
+        report = instrument.disable()
+
+        wall = elapsed if wall is None else min(wall, elapsed)
+        for stage, total in flatten_spans(report["spans"]).items():
+            stages[stage] = min(stages.get(stage, total), total)
+
+    points = np.array(traversal, dtype=np.float64).reshape(-1, 2)
+    estimate = Plotter().estimate(points * PLOT_SCALE)
+
+    return {
+        "wall_s": wall,
+        "peak_rss_bytes": peak_rss(),
+        "skeleton_pixels": int(skeleton.sum()),
+        "clusters": report["counters"].get("clusters", 0),
+        "traversal_points": len(traversal),
+        "pen_travel": float(np.hypot(*np.diff(points, axis=0).T).sum()),
+        "plot_s": estimate["time_s"],
+        "retrace": estimate["retrace"],
+        "stages_s": stages,
+    }
+
+
+def run_benchmark(input_dir: str, repeat: int) -> dict:
+    files = [
+        os.path.join(input_dir, name)
+        for name in sorted(os.listdir(input_dir))
+        if name.lower().endswith((".png", ".jpg", ".jpeg", ".bmp"))
+    ]
+
+    images = {}
+    for file_path in files:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+
+        # A fresh process per image keeps peak RSS from carrying over
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            images[name] = executor.submit(bench_image, file_path, repeat).result()
+
+        result = images[name]
+        print(
+            f"{name:24s} {result['wall_s']:6.2f}s | "
+            f"{(result['peak_rss_bytes'] or 0) / 2**20:6.1f} MB | "
+            f"{result['skeleton_pixels']:6d} px | {result['clusters']:3d} clusters | "
+            f"{result['traversal_points']:6d} points | "
+            f"travel {result['pen_travel']:9.1f} | "
+            f"plot {result['plot_s']:5.0f}s, retrace {result['retrace']:6.1f}"
+        )
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "images": images,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns a line for every timing that regressed past threshold, size that grew
+    past SIZE_THRESHOLD, or count that changed, against a baseline run.
+    """
+
+    regressions = []
+
+    for name, result in results["images"].items():
+        base = baseline["images"].get(name)
+        if base is None:
+            continue
+
+        timings = {metric: result[metric] for metric in TIME_METRICS}
+        timings.update(result["stages_s"])
+        base_timings = {metric: base[metric] for metric in TIME_METRICS}
+        base_timings.update(base["stages_s"])
+
+        for metric, value in timings.items():
+            old = base_timings.get(metric)
+            if old is None or value < MIN_TIME_S:
+                continue
+
+            if value > old * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} {old:.3f}s -> {value:.3f}s "
+                    f"(+{(value / max(old, 1e-9) - 1) * 100:.0f}%)"
+                )
+
+        for metric in SIZE_METRICS:
+            old, value = base.get(metric), result.get(metric)
+            if old is None or value is None:
+                continue
+
+            if value > old * (1 + SIZE_THRESHOLD):
+                regressions.append(
+                    f"{name}: {metric} {old:.0f} -> {value:.0f} "
+                    f"(+{(value / max(old, 1e-9) - 1) * 100:.0f}%)"
+                )
+
+        for metric in ("skeleton_pixels", "clusters", "traversal_points"):
+            if result[metric] != base[metric]:
+                regressions.append(
+                    f"{name}: {metric} changed {base[metric]} -> {result[metric]}"
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline on every image in a directory."
+    )
+    parser.add_argument("input", nargs="?", default="input", help="image directory")
+    parser.add_argument(
+        "-o", "--output", default="output/benchmark.json", help="results JSON"
+    )
+    parser.add_argument("-c", "--compare", help="baseline JSON to compare against")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=5, help="runs per image, fastest is kept"
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="relative slowdown flagged as a regression",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmark(args.input, args.repeat)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+
+        if regressions:
+            sys.exit(1)
+
+        print(f"No regressions against {args.compare}")
+
+
+# Images run in worker processes that re-import this module
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import importlib
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.skeleton import gen_skel
+from lib.slicer import CLUSTER_EPS, cluster_skeleton
+
+REPEAT = 5
+
+
+def same_clusters(a, b):
+    return len(a) == len(b) and all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+def best_time(skeleton, method):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        clusters = cluster_skeleton(skeleton, CLUSTER_EPS, method)
+        times.append(time.perf_counter() - start)
+
+    return clusters, min(times)
+
+
+def compare_methods(file_path):
+    """
+    Check connected-component labelling gives the same clusters as DBSCAN, and
+    compare their times.
+    """
+
+    skeleton = gen_skel(file_path, "/tmp/cluster_label_skel.png")
+
+    dbscan, dbscan_time = best_time(skeleton, "dbscan")
+    label, label_time = best_time(skeleton, "label")
+
+    print(
+        f"{os.path.basename(file_path):24s} {int(skeleton.sum()):6d} px | "
+        f"{len(label):3d} clusters | same {same_clusters(dbscan, label)} | "
+        f"dbscan {dbscan_time * 1000:6.1f}ms -> label {label_time * 1000:5.1f}ms"
+    )
+
+
+def compare_random(trials=50):
+    """
+    Check both methods agree on random pixel soups at a range of eps.
+    """
+
+    rng = np.random.default_rng(0)
+
+    for eps in (1, 1.5, 2, 3, 5, 7.5):
+        agree = all(
+            same_clusters(
+                cluster_skeleton(skeleton, eps, "dbscan"),
+                cluster_skeleton(skeleton, eps, "label"),
+            )
+            for skeleton in (
+                rng.random((120, 150)) < rng.uniform(0.002, 0.05) for _ in range(trials)
+            )
+        )
+        print(f"eps {eps:3.1f} | same clusters on {trials} random skeletons {agree}")
+
+
+def small_skeleton(rng):
+    """
+    A random pixel soup a few pixels across, with at least one pixel for DBSCAN.
+    """
+
+    skeleton = rng.random(rng.integers(1, 9, 2)) < rng.uniform(0.1, 0.6)
+    skeleton.flat[rng.integers(skeleton.size)] = True
+
+    return skeleton
+
+
+def compare_small(trials=50):
+    """
+    Check both methods agree on canvases narrower or shorter than eps, where some
+    steps reach past the edge.
+    """
+
+    rng = np.random.default_rng(0)
+
+    for eps in (1.5, 3, 5, 7.5):
+        agree = all(
+            same_clusters(
+                cluster_skeleton(skeleton, eps, "dbscan"),
+                cluster_skeleton(skeleton, eps, "label"),
+            )
+            for skeleton in (
+                [np.ones((3, 40), bool), np.ones((40, 3), bool), np.ones((1, 1), bool)]
+                + [small_skeleton(rng) for _ in range(trials)]
+            )
+        )
+        print(f"eps {eps:3.1f} | same clusters on {trials + 3} small skeletons {agree}")
+
+
+# Example usage
+start = time.perf_counter()
+importlib.import_module("sklearn.cluster")
+
+print(f"scikit-learn import {(time.perf_counter() - start) * 1000:.0f}ms")
+
+for name in sorted(os.listdir("input")):
+    compare_methods(os.path.join("input", name))
+
+compare_random()
+compare_small()
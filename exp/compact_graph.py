@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.graph import build_pixel_graph, shortest_graph_path
+from lib.skeleton import gen_skel
+
+
+def measure(build):
+    tracemalloc.start()
+    graph = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return graph, size
+
+
+def compare_graphs(file_path, searches=20):
+    """
+    Compare memory per pixel and shortest path throughput of the set-based and
+    compact graph backends on the skeleton of an image.
+    """
+
+    skeleton = gen_skel(file_path, "/tmp/compact_graph_skel.png")
+    coords = np.column_stack(np.where(skeleton))
+
+    graph, graph_size = measure(lambda: build_pixel_graph(coords))
+    compact, compact_size = measure(lambda: build_pixel_graph(coords, compact=True))
+
+    rng = np.random.default_rng(0)
+    pairs = rng.integers(0, len(coords), size=(searches, 2)).tolist()
+
+    timings = []
+    for g in (graph, compact):
+        start = time.perf_counter()
+        for a, b in pairs:
+            shortest_graph_path(g, a, b, None)
+        timings.append((time.perf_counter() - start) / searches)
+
+    print(
+        f"{os.path.basename(file_path):24s} {len(coords):6d} px | "
+        f"bytes/px {graph_size / len(coords):6.1f} -> {compact_size / len(coords):5.1f} | "
+        f"ms/search {timings[0] * 1000:7.2f} -> {timings[1] * 1000:6.2f}"
+    )
+
+
+# Example usage
+for name in sorted(os.listdir("input")):
+    compare_graphs(os.path.join("input", name))
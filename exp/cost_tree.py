@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.graph import (
+    Subgraph,
+    build_pixel_graph,
+    construct_tree,
+    dfs_priority_order,
+    intersection_subgraph,
+    reduce_subgraph,
+)
+from lib.skeleton import gen_skel
+from lib.slicer import cluster_skeleton
+
+
+class LegacyCostTreeNode:
+    """
+    The original cost tree: a linked node per subgraph node, with each insert adding
+    its cost to every ancestor.
+    """
+
+    def __init__(self, node, prev):
+        self.node = node
+        self.prev = prev
+
+        self.children = {}
+
+    def add_child(self, node, cost):
+        self.children[node.node] = [node, 0]
+
+        curr = self
+        node = node.node
+        while curr:
+            curr.children[node][1] += cost
+            node = curr.node
+            curr = curr.prev
+
+
+def legacy_construct_tree(subgraph):
+    root = LegacyCostTreeNode(0, None)
+
+    stack = [root]
+    visited = {0}
+
+    while stack:
+        curr = stack.pop(-1)
+
+        neighbors, neighbor_paths = subgraph.get_neighbors(curr.node)
+
+        for i in neighbors:
+            if i not in visited:
+                visited.add(i)
+
+                new_node = LegacyCostTreeNode(i, curr)
+                stack.append(new_node)
+
+                curr.add_child(new_node, len(neighbor_paths[i]))
+
+    return root
+
+
+def legacy_priority_order(subgraph, curr):
+    path = []
+    stack = [(curr, [])]
+
+    while stack:
+        curr, waypoints = stack.pop()
+
+        path.extend(waypoints)
+        path.append(curr.node)
+
+        children = sorted(curr.children, key=lambda k: curr.children[k][1])
+
+        for i in reversed(children):
+            to_child = subgraph.paths[curr.node][i]
+            stack.append(
+                (
+                    curr.children[i][0],
+                    [
+                        to_child[len(to_child) // 3],
+                        to_child[len(to_child) // 2],
+                        to_child[int(len(to_child) // 1.3)],
+                    ],
+                )
+            )
+
+    return path
+
+
+def chain_subgraph(length, spur_every=0):
+    """
+    A subgraph that is one long chain of nodes, the worst case for the legacy tree,
+    optionally with a single node spur every spur_every nodes.
+    """
+
+    subgraph = Subgraph(None)
+    subgraph.add_node(0)
+
+    for i in range(1, length):
+        subgraph.add_edge(i - 1, i, [i] * 3)
+        if spur_every and i % spur_every == 0:
+            subgraph.add_edge(i, length + i, [length + i] * 3)
+
+    return subgraph
+
+
+def compare(name, subgraph):
+    start = time.perf_counter()
+    legacy = legacy_priority_order(subgraph, legacy_construct_tree(subgraph))
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    order = dfs_priority_order(subgraph, construct_tree(subgraph))
+    flat_time = time.perf_counter() - start
+
+    print(
+        f"{name:24s} {len(subgraph.edges):6d} nodes | same order {order == legacy} | "
+        f"legacy {legacy_time * 1000:8.1f}ms -> flat {flat_time * 1000:6.1f}ms"
+    )
+
+
+def subgraph_of_largest_cluster(file_path):
+    clusters = cluster_skeleton(gen_skel(file_path, "/tmp/cost_tree_skel.png"))
+    cluster = max(clusters, key=len)
+
+    graph = build_pixel_graph(cluster)
+    return reduce_subgraph(
+        intersection_subgraph(graph, Subgraph(cluster), 0, 0, set()), 0
+    )
+
+
+# Example usage
+for name in sorted(os.listdir("input")):
+    compare(name, subgraph_of_largest_cluster(os.path.join("input", name)))
+
+for length in (1000, 4000, 16000):
+    compare(f"chain {length}", chain_subgraph(length))
+    compare(f"chain {length} with spurs", chain_subgraph(length, 7))
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.graph import PATH_CONSTRUCTORS
+from lib.plotter import Plotter
+from lib.skeleton import gen_skel
+from lib.slicer import slice
+
+# Plotter units per traversal pixel, as in main.py
+SCALE = 1 / 120.0
+
+# The Eulerian traversal has to slice a 480x480 image within this many seconds
+TIME_LIMIT_S = 1.0
+
+
+def compare_constructors(file_path, topology):
+    """
+    Retraced length, pen travel and estimated plot time of the whole traversal of
+    an image with each path constructor, against the waypoint constructor.
+    """
+
+    skeleton = gen_skel(file_path, "/tmp/eulerian_traversal_skel.png")
+    plotter = Plotter()
+
+    results = {}
+    for constructor in PATH_CONSTRUCTORS:
+        start = time.perf_counter()
+        traversal = slice(skeleton, None, topology=topology, constructor=constructor)
+        elapsed = time.perf_counter() - start
+
+        points = np.array(traversal, dtype=np.float64).reshape(-1, 2) * SCALE
+        results[constructor] = (elapsed, plotter.estimate(points))
+
+    baseline = results["waypoints"][1]["retrace"]
+
+    print(
+        f"{os.path.basename(file_path):24s} {topology:8s} | "
+        + " | ".join(
+            f"{constructor} {elapsed:5.2f}s retrace {estimate['retrace']:5.1f} "
+            f"({estimate['retrace'] / baseline - 1:+4.0%}) "
+            f"travel {estimate['travel']:6.1f} plot {estimate['time_s']:4.0f}s"
+            for constructor, (elapsed, estimate) in results.items()
+        )
+    )
+
+    assert results["eulerian"][0] < TIME_LIMIT_S, "Eulerian traversal too slow"
+
+
+# Example usage
+for topology in ("walk", "junction"):
+    for name in sorted(os.listdir("input")):
+        compare_constructors(os.path.join("input", name), topology)
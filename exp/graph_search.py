@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.graph import (
+    GRAPH_SEARCHES,
+    Subgraph,
+    build_pixel_graph,
+    construct_tree,
+    dfs_priority_order,
+    intersection_subgraph,
+    reduce_subgraph,
+    shortest_graph_path,
+)
+from lib.skeleton import gen_skel
+
+
+def legacy_graph_path(graph, index_a, index_b):
+    """
+    The original search: a full breadth first search with list pops.
+    """
+
+    prev = {index_a: (None, 0)}
+    visited = set()
+    queue = [index_a]
+    while queue:
+        current = queue.pop(0)
+
+        for i in graph.get_neighbors(current):
+            if i not in prev or prev[i][1] > 1 + prev[current][1]:
+                prev[i] = (current, 1 + prev[current][1])
+
+            if i not in visited:
+                visited.add(i)
+                queue.append(i)
+
+    path = []
+    current = index_b
+    while current is not None:
+        path.append(current)
+        current = prev[current][0]
+
+    return path
+
+
+def waypoint_pairs(skeleton):
+    """
+    The consecutive waypoint searches path_constructor runs on the largest cluster.
+    """
+
+    coords = np.column_stack(np.where(skeleton))
+    labels = DBSCAN(eps=5, min_samples=1).fit(coords).labels_
+    cluster = coords[labels == np.bincount(labels).argmax()]
+
+    graph = build_pixel_graph(cluster)
+    subgraph = reduce_subgraph(
+        intersection_subgraph(graph, Subgraph(cluster), 0, 0, set()), 0
+    )
+    ordering = dfs_priority_order(subgraph, construct_tree(subgraph))
+
+    return graph, list(zip(ordering[:-1], ordering[1:]))
+
+
+def bench_searches(file_path):
+    """
+    Time one call of each graph search between real path_constructor waypoints.
+    """
+
+    graph, pairs = waypoint_pairs(gen_skel(file_path, "/tmp/graph_search_skel.png"))
+
+    timings = {"legacy": legacy_graph_path}
+    timings.update(
+        {
+            name: lambda g, a, b, name=name: shortest_graph_path(g, a, b, None, name)
+            for name in GRAPH_SEARCHES
+        }
+    )
+
+    results = []
+    for name, search in timings.items():
+        start = time.perf_counter()
+        for a, b in pairs:
+            search(graph, a, b)
+        results.append(
+            f"{name} {(time.perf_counter() - start) / len(pairs) * 1e6:8.0f}us"
+        )
+
+    print(
+        f"{os.path.basename(file_path):24s} {len(pairs):4d} calls | "
+        + " | ".join(results)
+    )
+
+
+# Example usage
+for name in sorted(os.listdir("input")):
+    bench_searches(os.path.join("input", name))
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.graph import (
+    Subgraph,
+    build_pixel_graph,
+    intersection_subgraph,
+    junction_subgraphs,
+)
+from lib.skeleton import gen_skel
+from lib.slicer import cluster_skeleton, slice
+
+REPEAT = 5
+
+# Copies of each skeleton per side of the high resolution canvas, and the gap
+# between them that keeps copies from joining into one cluster
+TILES = 4
+TILE_GAP = 8
+
+
+def best_time(function):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def walk_subgraphs(clusters, graphs):
+    subgraphs = []
+    for cluster, graph in zip(clusters, graphs):
+        subgraph = Subgraph(cluster)
+        intersection_subgraph(graph, subgraph, 0, 0, set())
+        subgraphs.append(subgraph)
+
+    return subgraphs
+
+
+def edge_count(subgraphs):
+    return sum(len(ends) for subgraph in subgraphs for ends in subgraph.edges.values())
+
+
+def compare_topologies(name, skeleton):
+    """
+    Time finding the junctions and branches of every cluster by walking the pixel
+    graph against classifying pixels by their neighbourhoods, and compare how much
+    of the skeleton the final traversal of each covers.
+    """
+
+    clusters = cluster_skeleton(skeleton)
+    graphs = [build_pixel_graph(cluster) for cluster in clusters]
+
+    walk_time = best_time(lambda: walk_subgraphs(clusters, graphs))
+    junction_time = best_time(lambda: junction_subgraphs(clusters))
+
+    walk_edges = edge_count(walk_subgraphs(clusters, graphs))
+    junction_edges = edge_count(junction_subgraphs(clusters))
+
+    pixels = set(map(tuple, np.argwhere(skeleton)))
+    covered = {
+        topology: len(
+            pixels & set(map(tuple, slice(skeleton, None, topology=topology)))
+        )
+        for topology in ("walk", "junction")
+    }
+
+    print(
+        f"{name:24s} {len(pixels):7d} px | "
+        f"walk {walk_time * 1000:7.1f}ms {walk_edges:5d} edges "
+        f"{covered['walk'] / len(pixels):6.1%} covered | "
+        f"junction {junction_time * 1000:6.1f}ms {junction_edges:5d} edges "
+        f"{covered['junction'] / len(pixels):6.1%} covered | "
+        f"x{walk_time / junction_time:.1f}"
+    )
+
+
+# Example usage
+skeletons = {
+    name: gen_skel(os.path.join("input", name), "/tmp/junction_topology_skel.png") > 0
+    for name in sorted(os.listdir("input"))
+}
+
+for name, skeleton in skeletons.items():
+    compare_topologies(name, skeleton)
+
+for name, skeleton in skeletons.items():
+    tile = np.pad(skeleton, ((0, TILE_GAP), (0, TILE_GAP)))
+    compare_topologies(f"{name} x{TILES}", np.tile(tile, (TILES, TILES)))
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.skeleton import gen_skel
+from lib.slicer import slice
+
+TILES = (1, 2, 3, 4)
+WORKERS = max(2, os.cpu_count() or 1)
+
+
+def tiled_skeleton(skeletons, tiles):
+    """
+    Lays skeletons out on a tiles x tiles grid, so the cluster count grows with
+    the square of tiles while each cluster stays the same size.
+    """
+
+    size = max(max(s.shape) for s in skeletons)
+    canvas = np.zeros((size * tiles, size * tiles), dtype=bool)
+
+    for i in range(tiles * tiles):
+        skeleton = skeletons[i % len(skeletons)]
+        row, col = divmod(i, tiles)
+        canvas[
+            row * size : row * size + skeleton.shape[0],
+            col * size : col * size + skeleton.shape[1],
+        ] = skeleton
+
+    return canvas
+
+
+def bench_parallel(skeletons):
+    """
+    Time serial and parallel slicing as the number of clusters grows, checking
+    that both produce the same traversal.
+    """
+
+    print(f"{WORKERS} workers")
+
+    for tiles in TILES:
+        skeleton = tiled_skeleton(skeletons, tiles)
+        coords = np.column_stack(np.where(skeleton))
+        clusters = len(np.unique(DBSCAN(eps=5, min_samples=1).fit(coords).labels_))
+
+        start = time.perf_counter()
+        serial = slice(skeleton, None)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = slice(skeleton, None, workers=WORKERS)
+        parallel_time = time.perf_counter() - start
+
+        assert np.array_equal(
+            serial, parallel
+        ), "parallel slicing changed the traversal"
+
+        print(
+            f"{tiles}x{tiles} tiles {clusters:5d} clusters {len(coords):7d} px | "
+            f"serial {serial_time:6.2f}s | parallel {parallel_time:6.2f}s | "
+            f"speedup {serial_time / parallel_time:4.2f}x"
+        )
+
+
+# Workers re-import this module, so only benchmark when executed
+if __name__ == "__main__":
+    bench_parallel(
+        [
+            gen_skel(os.path.join("input", name), "/tmp/parallel_slice_skel.png")
+            for name in sorted(os.listdir("input"))
+        ]
+    )
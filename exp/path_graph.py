@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.slicer import path_candidate_graph, path_distances, prim_mst
+
+# Random path sets compared between the dense and sparse engines
+TRIALS = 100
+
+
+def random_paths(rng):
+    """
+    A few hundred short straight paths crowded into a small canvas, so many
+    bounding boxes overlap and tie at the same lower bound.
+    """
+
+    paths = []
+    for _ in range(rng.integers(100, 300)):
+        start = rng.integers(0, 100, 2)
+        end = start + rng.integers(-30, 31, 2)
+        t = np.linspace(0, 1, rng.integers(2, 6))[:, None]
+        paths.append([tuple(map(int, p)) for p in np.round(start + t * (end - start))])
+
+    return paths
+
+
+def tree_weight(matrix, edges):
+    return sum(matrix[a][b] for a, b in edges)
+
+
+def compare_random(trials=TRIALS):
+    """
+    Check the MST over the sparse candidate graph weighs the same as the one over
+    every pair, and compare their times.
+    """
+
+    rng = np.random.default_rng(0)
+
+    heavier = []
+    dense_time = 0
+    sparse_time = 0
+    for seed in range(trials):
+        paths = random_paths(rng)
+
+        start = time.perf_counter()
+        dense, _ = path_distances(paths)
+        dense_edges = prim_mst(dense)
+        dense_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        sparse, _ = path_candidate_graph(paths)
+        sparse_edges = prim_mst(sparse)
+        sparse_time += time.perf_counter() - start
+
+        dense_weight = tree_weight(dense, dense_edges)
+        sparse_weight = tree_weight(dense, sparse_edges)
+        if not np.isclose(dense_weight, sparse_weight):
+            heavier.append((seed, dense_weight, sparse_weight))
+
+    print(
+        f"{trials} random path sets | dense {dense_time:5.1f}s "
+        f"sparse {sparse_time:5.1f}s | {len(heavier)} sparse trees heavier"
+    )
+    for seed, dense_weight, sparse_weight in heavier:
+        print(f"  trial {seed}: dense {dense_weight:.2f} sparse {sparse_weight:.2f}")
+
+    assert not heavier, "sparse MST differs from the dense one"
+
+
+# Example usage
+compare_random()
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.render import rasterize, render_preview
+from lib.skeleton import gen_skel
+from lib.slicer import slice
+
+# Plotter units per traversal pixel, as in main.py
+SCALE = 1 / 120.0
+
+# Bytes PygameRecord keeps per frame, a 480x480 RGB image
+PYGAME_FRAME_BYTES = 480 * 480 * 3
+
+
+def long_path(length):
+    """
+    The traversals of every input image one after another, repeated until the
+    path has length points.
+    """
+
+    traversals = []
+    for name in sorted(os.listdir("input")):
+        skeleton = gen_skel(os.path.join("input", name), "/tmp/render_preview_skel.png")
+        traversals.append(np.array(slice(skeleton, None), dtype=np.float64) * SCALE)
+
+    path = np.concatenate(traversals)
+    return np.resize(path, (length, 2))
+
+
+def measure(path, output):
+    tracemalloc.start()
+    start = time.perf_counter()
+    frames = render_preview(map(tuple, path), output)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return frames, elapsed, peak
+
+
+def compare_lengths(lengths=(10000, 30000, 100000)):
+    """
+    Render time and peak traced memory of each output kind as paths grow, against
+    the frames PygameRecord would hold in memory.
+    """
+
+    path = long_path(max(lengths))
+
+    for length in lengths:
+        for output in ("/tmp/preview.png", "/tmp/preview.gif", "/tmp/preview.mp4"):
+            frames, elapsed, peak = measure(path[:length], output)
+            print(
+                f"{length:6d} points {os.path.splitext(output)[1]:4s} | "
+                f"{frames:5d} frames in {elapsed:6.2f}s | "
+                f"peak {peak / 2**20:6.1f} MB | "
+                f"file {os.path.getsize(output) / 2**20:6.2f} MB | "
+                f"PygameRecord {frames * PYGAME_FRAME_BYTES / 2**30:5.2f} GB"
+            )
+
+    # The last GIF frame holds the whole path as drawn in one pass, plus the dots
+    # left where the pen stood at each frame
+    gif = Image.open("/tmp/preview.gif")
+    gif.seek(gif.n_frames - 1)
+    last = np.array(gif.convert("L")) > 0
+    whole = rasterize(path[: lengths[-1]]) > 0
+    print(
+        f"one pass raster {whole.sum()} pixels, "
+        f"{(whole & ~last).sum()} missing from the last GIF frame"
+    )
+
+
+# Example usage
+compare_lengths()
@@ -0,0 +1,336 @@
+import asyncio
+import contextlib
+import io
+import os
+import random
+import select
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import serial
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.protocol import (
+    ACK,
+    FIXED_POINT_SCALE,
+    MAX_BATCH_POINTS,
+    NAK,
+    POINTS,
+    RESET,
+    RING_POINTS,
+    SEQ_MASK,
+    FrameParser,
+    encode_ack,
+)
+from lib import serial_async
+from lib.serial_async import plot_jobs, send_path_async
+from lib.serial_com import send_path, send_path_windowed
+from lib.skeleton import gen_skel
+from lib.slicer import slice
+
+BAUD_RATE = 115200
+
+# Simulated time for the motors to reach each point, 0 for an idle plotter
+MOVE_S = 0.0
+
+
+class LegacyPico:
+    """
+    Emulates the READY handshake of pico/main.c on the master side of a pty.
+    """
+
+    def __init__(self, fd, move_s=MOVE_S):
+        self.fd = fd
+        self.move_s = move_s
+        self.points = []
+        self.running = True
+
+    def run(self):
+        buffer = b""
+        os.write(self.fd, b"READYREADYREADYREADY\n")
+
+        while self.running:
+            if not select.select([self.fd], [], [], 0.05)[0]:
+                continue
+            buffer += os.read(self.fd, 4096)
+
+            while b")" in buffer:
+                message, buffer = buffer.split(b")", 1)
+                x, y = message[message.index(b"(") + 1 :].split(b",")
+                self.points.append((float(x), float(y)))
+
+                time.sleep(self.move_s)
+                os.write(self.fd, b"READYREADYREADYREADY\n")
+
+
+class WindowedPico:
+    """
+    Emulates the ring buffer and acks of pico/protocol.h on the master side of a
+    pty, optionally corrupting received bytes to exercise retransmission.
+    """
+
+    def __init__(self, fd, corrupt=0.0, seed=0, move_s=MOVE_S):
+        self.fd = fd
+        self.move_s = move_s
+        self.corrupt = corrupt
+        self.random = random.Random(seed)
+        self.points = []
+        self.running = True
+
+        self.parser = FrameParser()
+        self.ring = []
+        self.expected_seq = 0
+        self.nak_sent = False
+        self.started = False
+        self.reported_free = RING_POINTS
+
+    def send_ack(self, kind, seq):
+        free = RING_POINTS - len(self.ring)
+        os.write(self.fd, encode_ack(kind, seq, free))
+        self.reported_free = free
+
+    def nak(self):
+        if not self.nak_sent:
+            self.send_ack(NAK, self.expected_seq)
+            self.nak_sent = True
+
+    def handle_frame(self, seq, points):
+        if seq != self.expected_seq:
+            if ((self.expected_seq - seq) & SEQ_MASK) < 0x8000:
+                self.send_ack(ACK, (self.expected_seq - 1) & SEQ_MASK)
+            else:
+                self.nak()
+            return
+
+        if RING_POINTS - len(self.ring) < len(points):
+            return
+
+        self.ring.extend(points)
+        self.send_ack(ACK, seq)
+        self.expected_seq = (seq + 1) & SEQ_MASK
+        self.nak_sent = False
+
+    def handle_reset(self, seq, resume):
+        if (
+            not resume
+            or not self.started
+            or ((seq - self.expected_seq) & SEQ_MASK) < 0x8000
+        ):
+            self.expected_seq = seq
+        self.started = True
+        self.nak_sent = False
+        self.send_ack(ACK, (self.expected_seq - 1) & SEQ_MASK)
+
+    def run(self):
+        last_move = time.monotonic()
+
+        while self.running:
+            if select.select([self.fd], [], [], 0.001)[0]:
+                data = bytearray(os.read(self.fd, 4096))
+                for i in range(len(data)):
+                    if self.random.random() < self.corrupt:
+                        data[i] ^= 1 << self.random.randrange(8)
+
+                errors = self.parser.errors
+                frames = self.parser.feed(bytes(data))
+                if self.parser.errors > errors:
+                    self.nak()
+
+                for kind, seq, points in frames:
+                    if kind == POINTS:
+                        self.handle_frame(seq, points)
+                    elif kind == RESET:
+                        self.handle_reset(seq, points)
+
+            # The motors take one point off the ring per move
+            now = time.monotonic()
+            moves = (
+                len(self.ring)
+                if self.move_s == 0
+                else int((now - last_move) / self.move_s)
+            )
+            if moves or not self.ring:
+                self.points.extend(self.ring[:moves])
+                del self.ring[:moves]
+                last_move = now
+
+            if RING_POINTS - len(self.ring) >= self.reported_free + MAX_BATCH_POINTS:
+                self.send_ack(ACK, (self.expected_seq - 1) & SEQ_MASK)
+
+
+def loopback(pico_class, send, points, **kwargs):
+    """
+    Send points through a pty to an emulated Pico, returning the points it received
+    and the points per second achieved.
+    """
+
+    master, slave = os.openpty()
+    ser = serial.Serial(os.ttyname(slave), BAUD_RATE, timeout=1)
+
+    pico = pico_class(master, **kwargs)
+    thread = threading.Thread(target=pico.run, daemon=True)
+    thread.start()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        send(ser, os.ttyname(slave), points)
+
+    # The last frame is acked once it reaches the ring, let it drain
+    while len(pico.points) < len(points) and time.perf_counter() - start < 60:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    pico.running = False
+    thread.join()
+    ser.close()
+    os.close(master)
+    os.close(slave)
+
+    return pico.points, len(points) / elapsed
+
+
+def send_async(protocol, disconnect_at=None):
+    """
+    Adapt send_path_async to loopback, optionally closing the port once
+    disconnect_at points are acked to exercise resuming after a reconnect.
+    """
+
+    def send(ser, port, points):
+        ser.timeout = 0
+
+        def on_ack(count):
+            nonlocal disconnect_at
+            if disconnect_at is not None and count >= disconnect_at:
+                disconnect_at = None
+                ser.close()
+
+        asyncio.run(send_path_async(ser, port, points, protocol, on_ack=on_ack)).close()
+
+    return send
+
+
+def wire_rate(bytes_per_point):
+    # 8N1 framing puts 10 bits on the wire per byte
+    return BAUD_RATE / 10 / bytes_per_point
+
+
+def compare_protocols(count_legacy=300, count_windowed=20000):
+    rng = random.Random(0)
+    points = [
+        (round(rng.uniform(0, 4), 6), round(rng.uniform(0, 4), 6))
+        for _ in range(count_windowed)
+    ]
+
+    received, legacy_rate = loopback(LegacyPico, send_path, points[:count_legacy])
+    assert received == points[:count_legacy], "legacy protocol lost points"
+
+    legacy_bytes = sum(len(f"({x},{y})\n") for x, y in points[:count_legacy])
+    legacy_bytes /= count_legacy
+
+    print(
+        f"legacy    {legacy_rate:8.0f} points/s over pty | "
+        f"{legacy_bytes:5.1f} + 21 READY bytes/point, "
+        f"wire limit {wire_rate(21):5.0f} points/s at {BAUD_RATE} baud"
+    )
+
+    frame_bytes = (5 + 4 * MAX_BATCH_POINTS + 2) / MAX_BATCH_POINTS
+    for corrupt in (0.0, 0.001):
+        received, rate = loopback(
+            WindowedPico, send_path_windowed, points, corrupt=corrupt
+        )
+
+        error = max(
+            max(abs(a - c), abs(b - d))
+            for (a, b), (c, d) in zip(received, points, strict=True)
+        )
+        assert error <= 0.5 / FIXED_POINT_SCALE, "windowed protocol corrupted points"
+
+        print(
+            f"windowed  {rate:8.0f} points/s over pty | "
+            f"{frame_bytes:5.2f} bytes/point, "
+            f"wire limit {wire_rate(frame_bytes):5.0f} points/s at {BAUD_RATE} baud | "
+            f"{corrupt:.1%} bytes corrupted"
+        )
+
+    for pico_class, protocol, count in (
+        (LegacyPico, "text", count_legacy),
+        (WindowedPico, "windowed", count_windowed),
+    ):
+        received, rate = loopback(pico_class, send_async(protocol), points[:count])
+        assert len(received) == count, f"async {protocol} sender lost points"
+
+        resumed, _ = loopback(
+            pico_class, send_async(protocol, count // 2), points[:count]
+        )
+        assert resumed == received, f"async {protocol} sender did not resume"
+
+        print(
+            f"async {protocol:9s} {rate:8.0f} points/s over pty | "
+            f"resumed after a disconnect at point {count // 2} without loss"
+        )
+
+
+def prepare_image(file_path):
+    skeleton = gen_skel(file_path, "/tmp/serial_loopback_skel.png")
+    return [(x / 120.0, y / 120.0) for x, y in slice(skeleton, None)]
+
+
+def compare_overlap(files, move_s=0.0003):
+    """
+    Plot images back to back on an emulated plotter, slicing each image before
+    plotting it, then slicing the next image while the current one plots.
+    """
+
+    master, slave = os.openpty()
+    port = os.ttyname(slave)
+
+    pico = WindowedPico(master, move_s=move_s)
+    thread = threading.Thread(target=pico.run, daemon=True)
+    thread.start()
+
+    def drained(total):
+        while len(pico.points) < total:
+            time.sleep(0.001)
+
+    total = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for file_path in files:
+            points = prepare_image(file_path)
+            total += len(points)
+            ser = serial.Serial(port, BAUD_RATE, timeout=1)
+            send_async("windowed")(ser, port, points)
+            drained(total)
+    sequential = time.perf_counter() - start
+
+    pico.points.clear()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            asyncio.run(plot_jobs(port, files, prepare_image, "windowed", executor))
+        drained(total)
+    overlapped = time.perf_counter() - start - serial_async.RECONNECT_DELAY_S
+
+    pico.running = False
+    thread.join()
+    os.close(master)
+    os.close(slave)
+
+    print(
+        f"{len(files)} images, {total} points at {move_s * 1000:.1f}ms per move | "
+        f"slice then plot {sequential:6.2f}s | "
+        f"slice next while plotting {overlapped:6.2f}s"
+    )
+
+
+# Example usage
+if __name__ == "__main__":
+    serial_async.RECONNECT_DELAY_S = 0.05
+
+    compare_protocols()
+    compare_overlap(
+        [os.path.join("input", name) for name in sorted(os.listdir("input"))[:3]]
+    )
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.plotter import Plotter
+from lib.simplify import simplify
+from lib.skeleton import gen_skel
+from lib.slicer import slice
+
+# Plotter units per pixel of the skeleton, as in main.py
+SCALE = 1 / 120.0
+
+# Roughly a 0.8mm pen, one plotter unit is a motor revolution of about 42mm
+PEN_WIDTH = 0.02
+
+# Pixels per plotter unit when drawing paths to compare them
+RENDER_SCALE = 500
+
+TOLERANCES = (0.0025, 0.005, 0.01, 0.02)
+
+
+def draw(points):
+    """
+    Draw a path at pen width, as a boolean image of the paper.
+    """
+
+    canvas = np.zeros((4 * RENDER_SCALE, 4 * RENDER_SCALE), dtype=np.uint8)
+    pixels = np.round(np.asarray(points) * RENDER_SCALE).astype(np.int32)
+    cv2.polylines(
+        canvas,
+        [pixels.reshape(-1, 1, 2)],
+        False,
+        255,
+        thickness=round(PEN_WIDTH * RENDER_SCALE),
+    )
+
+    return canvas > 0
+
+
+def ink_moved(a, b):
+    """
+    Furthest any ink of one drawing is from ink of the other, in pen widths.
+    """
+
+    moved = 0
+    for source, target in ((a, b), (b, a)):
+        distances = cv2.distanceTransform((~target).astype(np.uint8), cv2.DIST_L2, 5)
+        moved = max(moved, distances[source].max())
+
+    return moved / RENDER_SCALE / PEN_WIDTH
+
+
+def compare_tolerances(file_path):
+    """
+    Point count, estimated plot time and ink changed at pen width for each
+    simplification tolerance.
+    """
+
+    skeleton = gen_skel(file_path, "/tmp/simplify_path_skel.png")
+    points = np.array(slice(skeleton, None), dtype=np.float64) * SCALE
+
+    drawing = draw(points)
+    ink = drawing.sum()
+
+    plotter = Plotter()
+    print(
+        f"{os.path.basename(file_path):24s} {len(points):6d} points | "
+        f"estimated {plotter.estimate(points)['time_s']:6.0f}s"
+    )
+
+    for tolerance in TOLERANCES:
+        start = time.perf_counter()
+        simplified = simplify(points, tolerance)
+        elapsed = time.perf_counter() - start
+
+        simplified_drawing = draw(simplified)
+        changed = (simplified_drawing ^ drawing).sum()
+
+        print(
+            f"  tolerance {tolerance:6.4f} ({tolerance / SCALE:4.2f}px) | "
+            f"{len(simplified):6d} points ({len(simplified) / len(points):6.1%}) | "
+            f"estimated {plotter.estimate(simplified)['time_s']:6.0f}s | "
+            f"ink changed {changed / ink:6.2%}, "
+            f"moved {ink_moved(simplified_drawing, drawing):4.2f} pen widths | "
+            f"{elapsed * 1000:5.0f}ms"
+        )
+
+
+# Example usage
+for name in sorted(os.listdir("input")):
+    compare_tolerances(os.path.join("input", name))
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.skeleton import gen_skel
+from lib.slicer import slice, slice_stream
+
+
+def pen_travel(points):
+    points = np.array(points, dtype=np.float64).reshape(-1, 2)
+    return np.hypot(*np.diff(points, axis=0).T).sum()
+
+
+def compare_stream(file_path):
+    """
+    Compare time to first point, total time, coverage and pen travel of streamed
+    slicing against the full slice.
+    """
+
+    skeleton = gen_skel(file_path, "/tmp/stream_slice_skel.png")
+
+    start = time.perf_counter()
+    full = slice(skeleton, None)
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stream = slice_stream(skeleton, None)
+    streamed = [next(stream)]
+    first_time = time.perf_counter() - start
+    streamed.extend(stream)
+    stream_time = time.perf_counter() - start
+
+    covered = len(set(map(tuple, np.array(full).tolist())))
+    stream_covered = len(set(map(tuple, np.array(streamed).tolist())))
+
+    print(
+        f"{os.path.basename(file_path):24s} "
+        f"first point {full_time * 1000:6.0f} -> {first_time * 1000:5.0f}ms | "
+        f"total {full_time:5.2f} -> {stream_time:5.2f}s | "
+        f"pixels {covered:6d} -> {stream_covered:6d} | "
+        f"travel {pen_travel(full):8.0f} -> {pen_travel(streamed):8.0f}"
+    )
+
+
+# Example usage
+for name in sorted(os.listdir("input")):
+    compare_stream(os.path.join("input", name))
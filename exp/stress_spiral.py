@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from skimage.morphology import skeletonize
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.slicer import slice
+
+SIZE = 2000
+SPACING = 12
+SPUR_EVERY = 40
+SPUR_LENGTH = 4
+
+
+def spiral_skeleton(size=SIZE, spacing=SPACING):
+    """
+    Draws a single-stroke Archimedean spiral filling a size x size canvas, with a
+    short spur every few pixels so the stroke is full of junctions.
+    """
+
+    canvas = np.zeros((size, size), dtype=np.uint8)
+    center = size / 2
+
+    theta = np.arange(0, (center - spacing) / spacing * 2 * np.pi, 0.5 / center)
+    radius = spacing * theta / (2 * np.pi)
+    xs = center + radius * np.cos(theta)
+    ys = center + radius * np.sin(theta)
+
+    points = np.round(np.column_stack((xs, ys))).astype(np.int32)
+    cv2.polylines(canvas, [points], False, 255, 1)
+
+    # Spurs point outwards and stay well short of the next turn of the spiral
+    arc = np.concatenate(([0], np.cumsum(np.hypot(np.diff(xs), np.diff(ys)))))
+    for i in np.searchsorted(arc, np.arange(SPUR_EVERY, arc[-1], SPUR_EVERY)):
+        direction = np.array((np.cos(theta[i]), np.sin(theta[i])))
+        start = points[i]
+        end = np.round(start + direction * SPUR_LENGTH).astype(np.int32)
+        cv2.line(
+            canvas, tuple(int(v) for v in start), tuple(int(v) for v in end), 255, 1
+        )
+
+    return skeletonize(canvas > 0)
+
+
+def stress_spiral():
+    skeleton = spiral_skeleton()
+    pixels = int(skeleton.sum())
+
+    start = time.perf_counter()
+    traversal = slice(skeleton, None)
+    elapsed = time.perf_counter() - start
+
+    covered = len(set((int(x), int(y)) for x, y in traversal))
+
+    print(
+        f"spiral {SIZE}x{SIZE}: {pixels} skeleton px, {len(traversal)} points, "
+        f"{covered / pixels:.1%} covered, recursion limit {sys.getrecursionlimit()}, "
+        f"{elapsed:.1f}s"
+    )
+
+    # Spurs are shorter than the dead end cutoff, so only they may be dropped
+    assert covered > 0.85 * pixels, "clusters were dropped while slicing"
+
+
+# Example usage
+stress_spiral()
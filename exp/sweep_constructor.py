@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib import instrument
+from lib.graph import PATH_CONSTRUCTORS, build_pixel_graph
+from lib.skeleton import gen_skel
+from lib.slicer import (
+    cluster_skeleton,
+    cluster_subgraph,
+    cluster_topologies,
+    subgraph_path,
+)
+
+# Teeth of the synthetic comb skeletons, and their spacing and length in pixels
+COMB_TEETH = (100, 400, 1600)
+COMB_SPACING = 6
+COMB_LENGTH = 12
+
+
+def comb_skeleton(teeth):
+    """
+    A single cluster skeleton of one long line with a tooth hanging off it every few
+    pixels, so the subgraph has a junction per tooth.
+    """
+
+    skeleton = np.zeros((COMB_LENGTH + 3, teeth * COMB_SPACING + 2), dtype=bool)
+    skeleton[1, 1:-1] = True
+    skeleton[2:-1, 1:-1:COMB_SPACING] = True
+
+    return skeleton
+
+
+def cluster_subgraphs(skeleton, topology):
+    clusters = cluster_skeleton(skeleton)
+
+    subgraphs = []
+    for cluster, cluster_topology in zip(
+        clusters, cluster_topologies(clusters, topology)
+    ):
+        graph = build_pixel_graph(cluster)
+        subgraph = cluster_subgraph(graph, cluster, topology=cluster_topology)
+        if subgraph is not None:
+            subgraphs.append((graph, subgraph))
+
+    return subgraphs
+
+
+def run_constructor(subgraphs, constructor):
+    instrument.enable(constructor)
+
+    start = time.perf_counter()
+    paths = [
+        subgraph_path(graph, subgraph, None, "bfs", constructor)
+        for graph, subgraph in subgraphs
+    ]
+    elapsed = time.perf_counter() - start
+
+    counters = instrument.disable()["counters"]
+
+    return [path for path in paths if path], elapsed, counters
+
+
+def compare_constructors(name, skeleton, topology="walk"):
+    """
+    Time ordering every cluster subgraph into a path with each constructor, with the
+    pixel graph searches and nodes they expanded, the skeleton pixels the paths
+    cover and the pen travel along them.
+    """
+
+    subgraphs = cluster_subgraphs(skeleton, topology)
+    pixels = set(map(tuple, np.argwhere(skeleton).tolist()))
+
+    results = []
+    for constructor in PATH_CONSTRUCTORS:
+        paths, elapsed, counters = run_constructor(subgraphs, constructor)
+
+        covered = pixels.intersection(point for path in paths for point in path)
+        travel = sum(
+            np.hypot(*np.diff(np.array(path, dtype=np.float64), axis=0).T).sum()
+            for path in paths
+        )
+
+        results.append(
+            f"{constructor} {elapsed * 1000:7.1f}ms "
+            f"{counters.get('graph_searches', 0) + counters.get('connectors', 0):5d} "
+            f"searches {counters.get('nodes_expanded', 0):8d} expanded "
+            f"{len(covered) / len(pixels):6.1%} covered travel {travel:7.0f}"
+        )
+
+    print(f"{name:24s} {len(pixels):6d} px | " + " | ".join(results))
+
+
+# Example usage
+for name in sorted(os.listdir("input")):
+    skeleton = gen_skel(os.path.join("input", name), "/tmp/sweep_constructor_skel.png")
+    compare_constructors(name, skeleton > 0)
+
+# Walking the pixel graph gives a comb subgraph with overlapping paths, so it is
+# split at its junctions instead
+for teeth in COMB_TEETH:
+    compare_constructors(f"comb {teeth}", comb_skeleton(teeth), "junction")
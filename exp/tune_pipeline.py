@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lib.pipeline import Pipeline
+from lib.skeleton import gen_skel
+from lib.slicer import TOPOLOGIES, slice
+
+# One knob at a time, as when tuning an image by hand
+TWEAKS = (
+    {"path_graph": "sparse"},
+    {"min_path_length": 20},
+    {"cluster_eps": 6},
+    {"dilate_iterations": 2},
+    {"canny_thresholds": (60, 160)},
+    {"canny_thresholds": (50, 150)},
+)
+
+
+def dead_ends(subgraphs):
+    return sum(
+        len(neighbors) == 1
+        for subgraph in subgraphs
+        if subgraph is not None
+        for neighbors in subgraph.edges.values()
+    )
+
+
+def tune(file_path):
+    """
+    Time a full pipeline run and then each tweak, showing which stages reran.
+    """
+
+    pipeline = Pipeline(file_path=file_path)
+
+    start = time.perf_counter()
+    traversal = pipeline.run()
+    print(
+        f"{os.path.basename(file_path):24s} full run {time.perf_counter() - start:6.2f}s"
+    )
+
+    expected = slice(gen_skel(file_path, "/tmp/tune_pipeline_skel.png"), None)
+    assert np.array_equal(traversal, expected), "pipeline differs from slice"
+
+    for tweak in TWEAKS:
+        pipeline.update(**tweak)
+        pipeline.computed.clear()
+
+        start = time.perf_counter()
+        pipeline.run()
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"    {str(tweak):36s} {elapsed:6.2f}s | "
+            + (" ".join(pipeline.computed) or "cached")
+        )
+
+
+def check_min_path_length(file_path, min_path_length=20):
+    """
+    Check a longer min_path_length drops dead ends with every topology.
+    """
+
+    for topology in TOPOLOGIES:
+        pipeline = Pipeline(file_path=file_path, topology=topology)
+        kept = dead_ends(pipeline.run("subgraph"))
+
+        pipeline.update(min_path_length=min_path_length)
+        longer = dead_ends(pipeline.run("subgraph"))
+
+        print(f"    {topology:8s} dead ends {kept:4d} -> {longer:4d}")
+        assert longer < kept, f"min_path_length ignored by the {topology} topology"
+
+
+# Example usage
+for name in sorted(os.listdir("input")):
+    tune(os.path.join("input", name))
+    check_min_path_length(os.path.join("input", name))
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from lib.graph import MIN_PATH_LENGTH
+from lib.skeleton import (
+    BLUR_KERNEL,
+    CANNY_THRESHOLDS,
+    DILATE_ITERATIONS,
+    DILATE_KERNEL,
+    RESIZE,
+    THIN_ITERATIONS,
+)
+from lib.slicer import CLUSTER_EPS
+
+# Bump when a change to the pipeline alters its output, so stale entries miss
+CACHE_VERSION = 2
+
+
+def pipeline_params(**options) -> dict:
+    """
+    Every parameter that affects the skeleton or traversal of an image, along with
+    any slicing options that change the result.
+    """
+
+    return {
+        "version": CACHE_VERSION,
+        "resize": RESIZE,
+        "blur_kernel": BLUR_KERNEL,
+        "canny_thresholds": CANNY_THRESHOLDS,
+        "thin_iterations": THIN_ITERATIONS,
+        "dilate_kernel": DILATE_KERNEL,
+        "dilate_iterations": DILATE_ITERATIONS,
+        "cluster_eps": CLUSTER_EPS,
+        "min_path_length": MIN_PATH_LENGTH,
+        **options,
+    }
+
+
+def cache_key(file_path: str, params: dict) -> str:
+    """
+    Hash of the image bytes and pipeline parameters, so an entry is reused only for
+    the same image sliced the same way.
+    """
+
+    digest = hashlib.sha256()
+
+    with open(file_path, "rb") as f:
+        digest.update(f.read())
+
+    digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+class PathCache:
+    """
+    On-disk cache of skeletons and traversals, one file per key. Skeletons are
+    stored as packed bitmaps and traversals as int32 arrays. File modification
+    times track use, and the least recently used entries are evicted once the
+    cache grows past max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str):
+        """
+        Returns the cached (skeleton, traversal) for a key, or None on a miss.
+        """
+
+        file_path = self.entry_path(key)
+
+        try:
+            with np.load(file_path) as data:
+                shape = tuple(data["shape"])
+                skeleton = np.unpackbits(
+                    data["skeleton"], count=int(np.prod(shape))
+                ).reshape(shape)
+                traversal = data["traversal"]
+        # A truncated or corrupt entry is a miss, and is overwritten by the next put
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+        # Mark as recently used
+        os.utime(file_path)
+
+        return skeleton.astype(bool), [tuple(point) for point in traversal.tolist()]
+
+    def put(self, key: str, skeleton, traversal):
+        os.makedirs(self.directory, exist_ok=True)
+
+        file_path = self.entry_path(key)
+
+        # Write then rename, so concurrent readers never see a partial entry
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                shape=np.array(skeleton.shape, dtype=np.int64),
+                skeleton=np.packbits(skeleton.astype(bool)),
+                traversal=np.array(traversal, dtype=np.int32).reshape(-1, 2),
+            )
+        os.replace(temp_path, file_path)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        """
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                file_path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, file_path))
+
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, file_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.remove(file_path)
+            except OSError:
+                continue
+            total -= size
+
+
+def cache_stream(points, cache: PathCache, key: str, skeleton):
+    """
+    Passes streamed points through, storing the traversal once it is exhausted.
+    """
+
+    traversal = []
+    for point in points:
+        traversal.append(point)
+        yield point
+
+    cache.put(key, skeleton, traversal)
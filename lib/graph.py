@@ -1,13 +1,84 @@
+from collections import deque
 from typing import Dict, List, Tuple, Set
-import pygame
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import (
+    breadth_first_order,
+    depth_first_order,
+    dijkstra,
+)
+
+try:
+    import pygame
+except ImportError:  # Only needed to draw on a debug screen
+    pygame = None
 import heapq
 import time
 
+from lib.instrument import count, timed
+
+# Offsets to the 8-neighbours of a pixel that come after it in row-major order
+FORWARD_OFFSETS = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+# Offsets to the 8-neighbours of a pixel in row-major order
+NEIGHBOUR_OFFSETS = (
+    (-1, -1),
+    (-1, 0),
+    (-1, 1),
+    (0, -1),
+    (0, 1),
+    (1, -1),
+    (1, 0),
+    (1, 1),
+)
+
+# Paths shorter than this are folded into their neighbours or dropped as dead ends
+MIN_PATH_LENGTH = 10
+
+
+class CoordIndex:
+    """
+    Dense lookup image mapping pixel coordinates to node indices over the bounding
+    box of a set of coordinates, giving O(1) coordinate to index lookups.
+    """
+
+    __slots__ = ("origin", "lookup")
+
+    def __init__(self, coords):
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 2)
+
+        if len(coords) == 0:
+            self.origin = (0, 0)
+            self.lookup = np.full((0, 0), -1, dtype=np.int32)
+            return
+
+        low = coords.min(axis=0)
+        high = coords.max(axis=0)
+
+        self.origin = (int(low[0]), int(low[1]))
+        self.lookup = np.full(tuple(high - low + 1), -1, dtype=np.int32)
+
+        # Later duplicates win, matching a linear scan that keeps the last match
+        self.lookup[coords[:, 0] - low[0], coords[:, 1] - low[1]] = np.arange(
+            len(coords), dtype=np.int32
+        )
+
+    def get(self, coord: Tuple[int, int]) -> int | None:
+        row = int(coord[0]) - self.origin[0]
+        col = int(coord[1]) - self.origin[1]
+
+        if not (0 <= row < self.lookup.shape[0] and 0 <= col < self.lookup.shape[1]):
+            return None
+
+        index = int(self.lookup[row, col])
+        return index if index >= 0 else None
+
 
 class Graph:
     def __init__(self, coords: List[Tuple[int, int]]):
         self.edges = {}
         self.coords = coords
+        self.coord_index = None
 
         for i in range(len(coords)):
             self.add_node(i)
@@ -25,6 +96,162 @@ class Graph:
     def get_coord(self, index: int) -> Tuple[int, int]:
         return self.coords[index]
 
+    def get_index(self, coord: Tuple[int, int]) -> int | None:
+        # Built on first use and reused by every later lookup
+        if self.coord_index is None:
+            self.coord_index = CoordIndex(self.coords)
+        return self.coord_index.get(coord)
+
+
+class CompactGraph:
+    """
+    Array-backed graph over pixel coordinates. Coordinates are kept as an N x 2
+    int16/int32 array and adjacency as CSR indptr/indices arrays, so each pixel
+    costs a few dozen bytes instead of a Python set. Neighbours of a node are
+    listed in ascending index order.
+    """
+
+    __slots__ = ("coords", "indptr", "indices", "coord_index", "_csr")
+
+    def __init__(self, coords, indptr, indices):
+        coords = np.asarray(coords).reshape(-1, 2)
+        small = len(coords) == 0 or np.abs(coords).max() < np.iinfo(np.int16).max
+
+        self.coords = coords.astype(np.int16 if small else np.int32)
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.coord_index = None
+        self._csr = None
+
+    @classmethod
+    def from_edges(cls, coords, index1, index2):
+        """
+        Builds a compact graph from two arrays of undirected edge endpoints.
+        """
+
+        num_nodes = len(coords)
+        sources = np.concatenate((index1, index2))
+        targets = np.concatenate((index2, index1))
+
+        order = np.lexsort((targets, sources))
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+
+        return cls(coords, indptr, targets[order])
+
+    @classmethod
+    def from_graph(cls, graph: Graph):
+        """
+        Converts a set-based graph into its compact form.
+        """
+
+        index1 = []
+        index2 = []
+        for i, neighbors in graph.edges.items():
+            for j in neighbors:
+                if i < j:
+                    index1.append(i)
+                    index2.append(j)
+
+        return cls.from_edges(
+            graph.coords,
+            np.array(index1, dtype=np.int64),
+            np.array(index2, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def get_neighbors(self, index: int) -> List[int]:
+        # A fresh list each call, so callers may remove entries as they walk
+        return self.indices[self.indptr[index] : self.indptr[index + 1]].tolist()
+
+    def get_coord(self, index: int) -> Tuple[int, int]:
+        return (int(self.coords[index][0]), int(self.coords[index][1]))
+
+    def get_index(self, coord: Tuple[int, int]) -> int | None:
+        if self.coord_index is None:
+            self.coord_index = CoordIndex(self.coords)
+        return self.coord_index.get(coord)
+
+    def to_csr(self) -> csr_matrix:
+        """
+        Returns the adjacency as a scipy CSR matrix sharing this graph's arrays.
+        """
+
+        if self._csr is None:
+            data = np.ones(len(self.indices), dtype=np.int8)
+            self._csr = csr_matrix(
+                (data, self.indices, self.indptr), shape=(len(self), len(self))
+            )
+
+        return self._csr
+
+
+def pixel_edges(coords) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds every pair of 8-neighbouring pixels in a list of coordinates. Neighbours
+    are found by looking up the coordinate keys of each forward offset in a sorted
+    key array, so time and memory stay linear in the number of pixels instead of
+    building a full pairwise distance matrix. Edges are returned as (low, high)
+    index arrays sorted in ascending order.
+    """
+
+    coords = np.asarray(coords, dtype=np.int64).reshape(-1, 2)
+    if len(coords) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Shift columns by one so the (1, -1) offset never wraps into the previous row
+    rows = coords[:, 0] - coords[:, 0].min()
+    cols = coords[:, 1] - coords[:, 1].min() + 1
+    stride = int(cols.max()) + 2
+
+    keys = rows * stride + cols
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    sources = []
+    targets = []
+    for dr, dc in FORWARD_OFFSETS:
+        wanted = keys + dr * stride + dc
+        pos = np.searchsorted(sorted_keys, wanted)
+        pos[pos == len(sorted_keys)] = 0
+        found = sorted_keys[pos] == wanted
+
+        sources.append(np.nonzero(found)[0])
+        targets.append(order[pos[found]])
+
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+
+    low = np.minimum(sources, targets)
+    high = np.maximum(sources, targets)
+    edge_order = np.lexsort((high, low))
+
+    return low[edge_order], high[edge_order]
+
+
+@timed()
+def build_pixel_graph(coords, compact: bool = False) -> Graph | CompactGraph:
+    """
+    Builds a graph over skeleton pixel coordinates, connecting every pixel to its
+    8-neighbours. With compact set, an array-backed CompactGraph is returned.
+    """
+
+    low, high = pixel_edges(coords)
+
+    if compact:
+        return CompactGraph.from_edges(coords, low, high)
+
+    graph = Graph(coords)
+
+    # Insert edges in ascending (low, high) order so neighbour sets are filled
+    # in the same order as a row-by-row scan of the pixels would fill them
+    for i, j in zip(low.tolist(), high.tolist()):
+        graph.add_edge(i, j)
+
+    return graph
+
 
 class Subgraph:
     def __init__(self, coords: List[Tuple[int, int]]):
@@ -66,17 +293,67 @@ class Subgraph:
         return self.coords[index]
 
 
+@timed()
 def intersection_subgraph(
-    graph: Graph,
+    graph: Graph | CompactGraph,
     subgraph: Subgraph,
     inter_node: int,
     start_node: int,
     visited: Set[int],
+    min_path_length: int = MIN_PATH_LENGTH,
 ) -> Subgraph:
     """
     Constructs a subgraph from a given graph, starting from a specified node and
     traversing through its neighbors. The function identifies intersections and
     dead ends as subgraph nodes, adding paths between these points as edges.
+    The graph itself is left untouched: unvisited neighbours are collected into
+    a separate list for each node, so the same graph can be reused afterwards.
+
+    Branches are walked with an explicit stack of intersection_walk generators
+    rather than recursion, so long strokes with many junctions never reach
+    Python's recursion limit. Paths of at most min_path_length pixels are folded
+    into their neighbours, or dropped if they are dead ends.
+    """
+
+    stack = [
+        intersection_walk(
+            graph, subgraph, inter_node, start_node, visited, min_path_length
+        )
+    ]
+
+    while stack:
+        try:
+            branch_inter_node, branch_start_node = next(stack[-1])
+        except StopIteration:
+            stack.pop()
+            continue
+
+        stack.append(
+            intersection_walk(
+                graph,
+                subgraph,
+                branch_inter_node,
+                branch_start_node,
+                visited,
+                min_path_length,
+            )
+        )
+
+    return subgraph
+
+
+def intersection_walk(
+    graph: Graph | CompactGraph,
+    subgraph: Subgraph,
+    inter_node: int,
+    start_node: int,
+    visited: Set[int],
+    min_path_length: int = MIN_PATH_LENGTH,
+):
+    """
+    Walks one branch of intersection_subgraph. Every branch leaving an
+    intersection is yielded as an (intersection, start) pair, and the walk resumes
+    once the caller has fully walked that branch.
     """
 
     # Path from start_node to next intersection
@@ -86,11 +363,7 @@ def intersection_subgraph(
         path.append(start_node)
 
     curr_node = start_node
-    current_options = graph.get_neighbors(curr_node)
-
-    for i in list(current_options):
-        if i in visited:
-            current_options.remove(i)
+    current_options = [i for i in graph.get_neighbors(curr_node) if i not in visited]
 
     visited.add(curr_node)
 
@@ -110,15 +383,14 @@ def intersection_subgraph(
             visited.add(curr_node)
             path.append(curr_node)
 
-            current_options: Set[int] = graph.get_neighbors(curr_node)
-            for option in list(current_options):
-                if option in visited:
-                    current_options.remove(option)
+            current_options = [
+                i for i in graph.get_neighbors(curr_node) if i not in visited
+            ]
 
         else:  # Intersection point
             for option in list(current_options):
                 if option not in visited:
-                    intersection_subgraph(graph, subgraph, curr_node, option, visited)
+                    yield curr_node, option
                 current_options.remove(option)
 
             if (
@@ -126,7 +398,7 @@ def intersection_subgraph(
             ):  # More than one path added to intersection
                 # Add the path to subgraph
 
-                if len(path) > 10 or inter_node == curr_node:
+                if len(path) > min_path_length or inter_node == curr_node:
                     subgraph.add_edge(inter_node, curr_node, path)
                 else:
                     for other in list(subgraph.edges[curr_node].keys()):
@@ -151,12 +423,249 @@ def intersection_subgraph(
     if path:
         endpoint = path.pop(-1)
 
-        if len(path) > 10:  # Keep only dead ends that are large enough to see
+        if (
+            len(path) > min_path_length
+        ):  # Keep only dead ends that are large enough to see
             subgraph.add_edge(inter_node, endpoint, path)
 
-    return subgraph
 
+def neighbourhood_codes(present: np.ndarray) -> np.ndarray:
+    """
+    Packs an N x 8 boolean array of which neighbours each pixel has into one byte
+    per pixel, as convolving with power of two weights would. Each row is read as a
+    64 bit word, and multiplying that by a constant moves every byte onto its own
+    bit of the top byte.
+    """
+
+    words = np.ascontiguousarray(present).view(np.uint64).ravel()
+    return (words * np.uint64(0x0102040810204080) >> np.uint64(56)).astype(np.uint8)
+
+
+def m_adjacency_table() -> np.ndarray:
+    """
+    Which neighbours a pixel is m-adjacent to for each of the 256 neighbourhood
+    codes: every 4-neighbour, and each diagonal neighbour not already linked to it
+    through a shared 4-neighbour. m-adjacency keeps the connectivity of the
+    8-neighbour graph while a staircase step or an L corner stays a single line of
+    pixels with two neighbours each, instead of a run of false junctions.
+    """
+
+    present = (np.arange(256)[:, None] >> np.arange(8)) & 1 == 1
+    adjacent = present.copy()
+
+    for bit, (dr, dc) in enumerate(NEIGHBOUR_OFFSETS):
+        if dr and dc:
+            adjacent[:, bit] &= ~present[:, NEIGHBOUR_OFFSETS.index((dr, 0))]
+            adjacent[:, bit] &= ~present[:, NEIGHBOUR_OFFSETS.index((0, dc))]
+
+    table = np.zeros_like(adjacent)
+    table[neighbourhood_codes(present)] = adjacent
 
+    return table
+
+
+M_ADJACENCY = m_adjacency_table()
+M_DEGREE = M_ADJACENCY.sum(axis=1)
+
+
+def pixel_search(neighbors, adjacent, degree, roots):
+    """
+    Depth first search, run in C, over the adjacency of every pixel from a virtual
+    node linked to each root. The CSR arrays come straight from the table of
+    neighbour indices plus one.
+    Returns the pixels in the order reached, without the virtual node, and the
+    predecessor of every pixel, which is negative where it wasn't reached.
+    """
+
+    num_pixels = len(neighbors)
+
+    indptr = np.zeros(num_pixels + 2, dtype=np.int32)
+    np.cumsum(degree, out=indptr[1:-1])
+    indptr[-1] = indptr[-2] + len(roots)
+    indices = np.concatenate(
+        (neighbors.ravel().compress(adjacent.ravel()) - 1, roots)
+    ).astype(np.int32)
+
+    order, predecessors = depth_first_order(
+        csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(num_pixels + 1, num_pixels + 1),
+        ),
+        num_pixels,
+        True,
+        True,
+    )
+
+    return order[1:], predecessors
+
+
+@timed()
+def junction_subgraphs(
+    clusters, min_path_length: int = MIN_PATH_LENGTH
+) -> List[Subgraph]:
+    """
+    Vectorized alternative to intersection_subgraph, building the subgraph of
+    junctions and dead ends of every cluster at once, rooted at each cluster's first
+    pixel. Python only loops over branches, never over single pixels.
+
+    The 3x3 neighbourhood of every skeleton pixel is read as an 8 bit code, the
+    kernel evaluated at the skeleton pixels alone so the cost follows the pixel
+    count rather than the canvas, and M_ADJACENCY gives its neighbours: endpoints
+    have one, junctions three or more, and every other pixel has exactly two and
+    lies on a branch. A single depth first search over every cluster, run in C,
+    then does the tracing. It only reaches pixels connected to a root, as
+    path_constructor does, and enters each branch at one end and follows it to the
+    other, so every branch is one run of its order. A branch ending at a node the
+    search reached first closes a loop, and as in the walk stops short of that node
+    as a dead end, so each subgraph is a tree. Neighbouring junction pixels are one
+    node, represented by the pixel the search reached first.
+
+    Dead ends of at most min_path_length pixels are dropped as spurs, and nodes left
+    joining two branches are folded into one path.
+    """
+
+    subgraphs = [Subgraph(cluster) for cluster in clusters]
+    if not subgraphs:
+        return subgraphs
+
+    sizes = [len(cluster) for cluster in clusters]
+    offsets = np.cumsum([0] + sizes[:-1])
+    cluster_of = np.repeat(np.arange(len(sizes)), sizes)
+    num_pixels = len(cluster_of)
+
+    coords = np.concatenate(
+        [np.asarray(cluster, dtype=np.int64).reshape(-1, 2) for cluster in clusters]
+    )
+
+    # Pixel indices plus one, zero where there is no pixel, so neighbors holds them
+    # plus one too. A one pixel border keeps every neighbour lookup inside the image
+    low = np.array((coords[:, 0].min(), coords[:, 1].min())) - 1
+    high = np.array((coords[:, 0].max(), coords[:, 1].max())) + 1
+    rows, cols = (coords - low).T
+    index = np.zeros(tuple(high - low + 1), dtype=np.int32)
+    index[rows, cols] = np.arange(1, num_pixels + 1)
+
+    steps = np.array([dr * index.shape[1] + dc for dr, dc in NEIGHBOUR_OFFSETS])
+    neighbors = index.ravel().take((rows * index.shape[1] + cols)[:, None] + steps)
+
+    codes = neighbourhood_codes(neighbors > 0)
+    adjacent = M_ADJACENCY.take(codes, axis=0)
+    degree = M_DEGREE.take(codes)
+
+    virtual = num_pixels
+    order, predecessors = pixel_search(neighbors, adjacent, degree, offsets)
+    previous = predecessors[order]
+
+    # Clusters only touch when cluster_eps is below a diagonal step. The search then
+    # crosses a link between two of them, and only the roots, reached from the
+    # virtual node, may have a predecessor outside their cluster
+    crossed = np.append(cluster_of, -1)[previous] != cluster_of[order]
+    if np.count_nonzero(crossed) > len(offsets):
+        adjacent &= cluster_of[neighbors - 1] == cluster_of[:, None]
+        degree = adjacent.sum(axis=1)
+        order, predecessors = pixel_search(neighbors, adjacent, degree, offsets)
+        previous = predecessors[order]
+
+    node = np.append(degree != 2, True)
+    node[offsets] = True
+
+    # A branch starts where the search leaves a node for a branch pixel, and runs
+    # until the next pixel that doesn't continue it
+    on_branch = ~node[order]
+    first = on_branch & node[previous]
+    continued = np.append(on_branch & ~first, False)
+    start_at = np.nonzero(first)[0]
+    end_at = np.nonzero(on_branch & ~continued[1:])[0]
+
+    starts = previous[start_at]
+    ends = order[end_at]
+
+    # The last pixel of a branch has two neighbours, the one before it and the node
+    # it ends at
+    beyond = (
+        np.where(adjacent[ends], neighbors[ends], 0).sum(axis=1)
+        - 2
+        - predecessors[ends]
+    )
+    tree = predecessors[beyond] == ends
+
+    # Junction pixels reached straight from another node join its node
+    joined = np.nonzero(node[:-1] & (predecessors[:-1] >= 0))[0]
+    joined = joined[node[predecessors[joined]] & (predecessors[joined] != virtual)]
+    representative = np.arange(num_pixels)
+    representative[joined] = predecessors[joined]
+    while True:
+        hops = representative[representative[joined]]
+        if np.array_equal(hops, representative[joined]):
+            break
+        representative[joined] = hops
+    starts = representative[starts]
+
+    # Dead ends, and branches into a node touching no other branch, are spurs
+    lengths = end_at - start_at + 1
+    touching = np.bincount(np.concatenate((starts, beyond[tree])), minlength=num_pixels)
+    root = np.zeros(num_pixels, dtype=bool)
+    root[offsets] = True
+    spur = ~tree | (touching[beyond] == 1) & ~root[beyond]
+    kept = ~spur | (lengths > min_path_length)
+    starts, beyond, tree, start_at, lengths = (
+        values[kept] for values in (starts, beyond, tree, start_at, lengths)
+    )
+    count("branches", len(starts))
+
+    # A branch ends at the node beyond it, or at its own last pixel as a dead end
+    ends = np.where(tree, beyond, order[start_at + lengths - 1])
+
+    # Nodes left with one branch in and one out are folded away by chaining the
+    # branch out onto the branch in, then ranking every chain by pointer jumping
+    touching = np.bincount(np.concatenate((starts, ends[tree])), minlength=num_pixels)
+    entering = np.full(num_pixels, -1, dtype=np.int64)
+    entering[ends[tree]] = np.nonzero(tree)[0]
+    folded = (touching[starts] == 2) & ~root[starts]
+
+    head = np.where(folded, entering[starts], np.arange(len(starts)))
+    rank = folded.astype(np.int64)
+    while True:
+        ahead = head[head]
+        if np.array_equal(ahead, head):
+            break
+        rank += rank[head]
+        head = ahead
+
+    # Pixels of every chain in order, each branch followed by the node beyond it
+    chain = np.lexsort((rank, head))
+    piece = tree[chain] + lengths[chain]
+    piece_end = np.cumsum(piece)
+    piece_start = piece_end - piece
+    within = np.arange(piece_end[-1] if len(piece) else 0) - np.repeat(
+        piece_start, piece
+    )
+    source = np.where(
+        within < np.repeat(lengths[chain], piece),
+        np.repeat(start_at[chain], piece) + within,
+        len(order) + np.repeat(np.arange(len(chain)), piece),
+    )
+    pixels = np.append(order, ends[chain])[source]
+    local = (pixels - offsets[cluster_of[pixels]]).tolist()
+
+    first = np.nonzero(rank[chain] == 0)[0]
+    last = np.append(first[1:], len(chain)) - 1
+    start_nodes = starts[chain[first]]
+    end_nodes = ends[chain[last]]
+
+    for cluster, start, end, low, high in zip(
+        cluster_of[start_nodes].tolist(),
+        (start_nodes - offsets[cluster_of[start_nodes]]).tolist(),
+        (end_nodes - offsets[cluster_of[end_nodes]]).tolist(),
+        piece_start[first].tolist(),
+        piece_end[last].tolist(),
+    ):
+        subgraphs[cluster].add_edge(start, end, local[low:high])
+
+    return subgraphs
+
+
+@timed()
 def reduce_subgraph(subgraph: Subgraph, root: int) -> Subgraph:
     """
     Consolidate all nodes within some cartesian distance of each other into a single node.
@@ -238,66 +747,219 @@ def shortest_path(graph: Subgraph, index_a: int, index_b: int) -> List[int] | No
     return path
 
 
-def shortest_graph_path(
-    graph: Graph, index_a: int, index_b: int, screen
-) -> List[int] | None:
-    prev = {index_a: (None, 0)}
-    visited = set()
-    queue = [index_a]
+def trace_path(prev: Dict[int, int | None], index: int) -> List[int]:
+    """
+    Follows a predecessor map back from index to the search root.
+    """
+
+    path = []
+    current = index
+    while current is not None:
+        path.append(current)
+        current = prev[current]
+    path.reverse()
+
+    return path
+
+
+def bfs_search(graph: Graph | CompactGraph, index_a: int, index_b: int) -> List[int] | None:
+    """
+    Breadth first search that stops as soon as index_b is discovered. Returns the
+    node indices of the path, or None if no path found.
+    """
+
+    prev = {index_a: None}
+    queue = deque([index_a])
+
     while queue:
-        current = queue.pop(0)
-        # print(current)
-        neighbors = graph.get_neighbors(current)
+        current = queue.popleft()
 
-        for i in neighbors:
-            if i in graph.edges[current]:
-                if i not in prev or prev[i][1] > 1 + prev[current][1]:
-                    prev[i] = (current, 1 + prev[current][1])
+        for i in graph.get_neighbors(current):
+            if i not in prev:
+                prev[i] = current
+
+                if i == index_b:
+                    count("nodes_expanded", len(prev))
+                    return trace_path(prev, index_b)
 
-            if i not in visited:
-                visited.add(i)
                 queue.append(i)
 
-    if index_b not in prev:
+    count("nodes_expanded", len(prev))
+    return trace_path(prev, index_b) if index_b in prev else None
+
+
+def bidirectional_search(
+    graph: Graph | CompactGraph, index_a: int, index_b: int
+) -> List[int] | None:
+    """
+    Breadth first search run from both ends, expanding the smaller frontier one
+    level at a time. The first node reached from both sides lies on a shortest
+    path. Returns the node indices of the path, or None if no path found.
+    """
+
+    if index_a == index_b:
+        return [index_a]
+
+    prev_a = {index_a: None}
+    prev_b = {index_b: None}
+    frontier_a = [index_a]
+    frontier_b = [index_b]
+
+    while frontier_a and frontier_b:
+        swapped = len(frontier_a) > len(frontier_b)
+        if swapped:
+            frontier, prev, other = frontier_b, prev_b, prev_a
+        else:
+            frontier, prev, other = frontier_a, prev_a, prev_b
+
+        next_frontier = []
+        for current in frontier:
+            for i in graph.get_neighbors(current):
+                if i in prev:
+                    continue
+
+                prev[i] = current
+
+                if i in other:
+                    count("nodes_expanded", len(prev_a) + len(prev_b))
+                    return trace_path(prev_a, i) + trace_path(prev_b, i)[::-1][1:]
+
+                next_frontier.append(i)
+
+        if swapped:
+            frontier_b = next_frontier
+        else:
+            frontier_a = next_frontier
+
+    count("nodes_expanded", len(prev_a) + len(prev_b))
+    return None
+
+
+def octile_distance(coord_a: Tuple[int, int], coord_b: Tuple[int, int]) -> int:
+    """
+    Octile distance between two pixels with unit cost diagonal steps, which is
+    the fewest 8-connected moves between them.
+    """
+
+    return max(abs(coord_a[0] - coord_b[0]), abs(coord_a[1] - coord_b[1]))
+
+
+def astar_search(graph: Graph | CompactGraph, index_a: int, index_b: int) -> List[int] | None:
+    """
+    A* search over pixel coordinates guided by the octile distance to index_b.
+    Returns the node indices of the path, or None if no path found.
+    """
+
+    target = graph.get_coord(index_b)
+
+    prev = {index_a: None}
+    cost = {index_a: 0}
+    closed = set()
+
+    # Counter breaks ties in insertion order so nodes are never compared
+    heap = [(octile_distance(graph.get_coord(index_a), target), 0, index_a)]
+    counter = 1
+
+    while heap:
+        _, _, current = heapq.heappop(heap)
+
+        if current == index_b:
+            count("nodes_expanded", len(closed))
+            return trace_path(prev, index_b)
+
+        if current in closed:
+            continue
+        closed.add(current)
+
+        next_cost = cost[current] + 1
+        for i in graph.get_neighbors(current):
+            if i not in cost or next_cost < cost[i]:
+                cost[i] = next_cost
+                prev[i] = current
+
+                estimate = next_cost + octile_distance(graph.get_coord(i), target)
+                heapq.heappush(heap, (estimate, counter, i))
+                counter += 1
+
+    count("nodes_expanded", len(closed))
+    return None
+
+
+GRAPH_SEARCHES = {
+    "bfs": bfs_search,
+    "bidirectional": bidirectional_search,
+    "astar": astar_search,
+}
+
+
+def shortest_graph_path(
+    graph: Graph | CompactGraph, index_a: int, index_b: int, screen, search: str = "bfs"
+) -> List[Tuple[int, int]] | None:
+    """
+    Returns the coordinates of a shortest path between two nodes in a pixel graph.
+    Returns None if no path found. search selects the algorithm from
+    GRAPH_SEARCHES; all of them return paths of the same length.
+    """
+
+    if search not in GRAPH_SEARCHES:
+        raise ValueError(f"Unknown graph search: {search}")
+
+    count("graph_searches")
+
+    if search == "bfs" and isinstance(graph, CompactGraph):
+        return compact_graph_path(graph, index_a, index_b)
+
+    path = GRAPH_SEARCHES[search](graph, index_a, index_b)
+    if path is None:
+        return None
+
+    return [tuple(int(v) for v in graph.get_coord(i)) for i in path]
+
+
+def compact_graph_path(
+    graph: CompactGraph, index_a: int, index_b: int
+) -> List[Tuple[int, int]] | None:
+    """
+    Breadth first search over a compact graph, run in C through scipy's csgraph.
+    Returns the coordinates of the path, or None if no path found.
+    """
+
+    order, predecessors = breadth_first_order(
+        graph.to_csr(), index_a, directed=True, return_predecessors=True
+    )
+    count("nodes_expanded", len(order))
+
+    if index_a != index_b and predecessors[index_b] < 0:
         return None
 
     path = []
     current = index_b
-    while current is not None:
-        path.append((int(graph.coords[current][0]), int(graph.coords[current][1])))
-        current = prev[current][0]
+    while current >= 0:
+        path.append(graph.get_coord(current))
+        current = predecessors[current]
     path.reverse()
 
-    if path is None:
-        return None
-
     return path
 
 
 def shortest_graph_path_coords(
-    graph: Graph, coord_a: Tuple[int, int], coord_b: Tuple[int, int], screen
+    graph: Graph | CompactGraph,
+    coord_a: Tuple[int, int],
+    coord_b: Tuple[int, int],
+    screen,
+    search: str = "bfs",
 ) -> List[int] | None:
     """
     Returns the shortest path between two coordinates in a graph. Returns None if no path found.
     """
 
-    index_a = None
-    index_b = None
-
-    for i in range(len(graph.coords)):
-        if graph.coords[i][0] == int(coord_a[0]) and graph.coords[i][1] == int(
-            coord_a[1]
-        ):
-            index_a = i
-        if graph.coords[i][0] == int(coord_b[0]) and graph.coords[i][1] == int(
-            coord_b[1]
-        ):
-            index_b = i
+    index_a = graph.get_index(coord_a)
+    index_b = graph.get_index(coord_b)
 
     if index_a is None or index_b is None:
         return None
 
-    return shortest_graph_path(graph, index_a, index_b, screen)
+    return shortest_graph_path(graph, index_a, index_b, screen, search)
 
 
 def shortest_subgraph_path(
@@ -337,83 +999,114 @@ def shortest_subgraph_path(
     return full_path
 
 
-class CostTreeNode:
+class CostTree:
     """
-    Node in a cost tree.
+    Spanning tree of a subgraph from node 0 as flat arrays indexed by the order
+    nodes were discovered in. parent holds the index of each node's parent, -1 for
+    the root, and cost the edge length from the parent plus that of every edge
+    below the node.
     """
 
-    def __init__(self, node: int, prev):
-        self.node = node
-        self.prev = prev
-
-        self.children = {}
+    def __init__(self, nodes: List[int], parent: List[int], cost: List[int]):
+        self.nodes = nodes
+        self.parent = parent
+        self.cost = cost
 
-    def add_child(self, node, cost: float):
+    def child_order(self) -> Tuple[List[int], List[int]]:
+        """
+        Children of every node grouped by parent and sorted by cost, ties kept in the
+        order they were discovered, with the end of each node's group.
+        """
 
-        self.children[node.node] = [node, 0]
+        parent = np.array(self.parent)
 
-        self.backprop_cost(cost, node.node)
+        children = np.lexsort((self.cost, parent))[1:].tolist()
+        ends = np.cumsum(np.bincount(parent[1:], minlength=len(self.nodes))).tolist()
 
-    def backprop_cost(self, cost: float, node: int):
-        self.children[node][1] += cost
+        return children, ends
 
-        if self.prev:
-            self.prev.backprop_cost(cost, self.node)
 
-
-def construct_tree(subgraph: Subgraph) -> CostTreeNode:
+def construct_tree(subgraph: Subgraph) -> CostTree:
     """
     Construct a cost tree from a subgraph where each node represents a point in the subgraph
     and its cost is the sum of the costs of its children. This cost effectively
     represents the total area covered by a branch of a tree and all its children (including edge lengths).
     """
 
-    root = CostTreeNode(0, None)
-    curr = root
+    nodes = [0]
+    parent = [-1]
+    cost = [0]
 
-    stack = [root]
-    visited = set()
-    visited.add(root.node)
+    discovered = {0: 0}
+    stack = [0]
 
     while stack:
-        curr = stack.pop(-1)
+        curr = stack.pop()
 
-        neighbors, neighbor_paths = subgraph.get_neighbors(curr.node)
+        for i, length in subgraph.edges[nodes[curr]].items():
+            if i not in discovered:
+                discovered[i] = len(nodes)
+                stack.append(len(nodes))
 
-        for i in neighbors:
-            if i not in visited:
-                visited.add(i)
+                nodes.append(i)
+                parent.append(curr)
+                cost.append(length)
 
-                new_node = CostTreeNode(i, curr)
-                stack.append(new_node)
+    # Every node is discovered after its parent, so in reverse the cost below a
+    # node is complete before it is added to its parent's
+    for i in range(len(nodes) - 1, 0, -1):
+        cost[parent[i]] += cost[i]
 
-                curr.add_child(new_node, len(neighbor_paths[i]))
+    return CostTree(nodes, parent, cost)
 
-    return root
 
+def dfs_priority_order(subgraph: Subgraph, tree: CostTree) -> List[int]:
+    """
+    Orders the nodes of a cost tree depth first, visiting cheaper children first.
+    Three waypoints along the subgraph path to each child are emitted before it.
+    """
 
-def dfs_priority_order(subgraph: Subgraph, curr: CostTreeNode) -> List[int]:
-    children = list(curr.children.keys())
-    children.sort(key=lambda k: curr.children[k][1])
+    nodes = tree.nodes
+    children, ends = tree.child_order()
 
-    path = [curr.node]
+    path = []
 
-    for i in children:
-        subgraph_path_curr_to_child = subgraph.paths[curr.node][i]
-        point_a = len(subgraph_path_curr_to_child) // 3
-        point_b = len(subgraph_path_curr_to_child) // 2
-        point_c = int(len(subgraph_path_curr_to_child) // 1.3)
-        path.append(subgraph_path_curr_to_child[point_a])
-        path.append(subgraph_path_curr_to_child[point_b])
-        path.append(subgraph_path_curr_to_child[point_c])
+    # Each entry is a tree node and the waypoints leading to it
+    stack = [(0, [])]
 
-        path.extend(dfs_priority_order(subgraph, curr.children[i][0]))
+    while stack:
+        curr, waypoints = stack.pop()
+        node = nodes[curr]
+
+        path.extend(waypoints)
+        path.append(node)
+
+        paths = subgraph.paths[node]
+
+        # Pushed in reverse so the cheapest child is popped first
+        for i in reversed(children[ends[curr - 1] if curr else 0 : ends[curr]]):
+            subgraph_path_curr_to_child = paths[nodes[i]]
+            point_a = len(subgraph_path_curr_to_child) // 3
+            point_b = len(subgraph_path_curr_to_child) // 2
+            point_c = int(len(subgraph_path_curr_to_child) // 1.3)
+
+            stack.append(
+                (
+                    i,
+                    [
+                        subgraph_path_curr_to_child[point_a],
+                        subgraph_path_curr_to_child[point_b],
+                        subgraph_path_curr_to_child[point_c],
+                    ],
+                )
+            )
 
     return path
 
 
+@timed()
 def path_constructor(
-    graph: Graph, subgraph: Subgraph, root: int, screen
+    graph: Graph | CompactGraph, subgraph: Subgraph, root: int, screen, search: str = "bfs"
 ) -> List[Tuple[int, int]] | None:
     """
     Constructs a path from a list of nodes in a subgraph, returning the coordinates of each node in the path.
@@ -430,7 +1123,7 @@ def path_constructor(
     for i in ordering:
         if i not in visited:
             visited.add(i)
-            shortest = shortest_graph_path(graph, curr, i, screen)
+            shortest = shortest_graph_path(graph, curr, i, screen, search)
             if shortest:
                 path.extend(shortest)
                 for j in shortest:
@@ -441,3 +1134,339 @@ def path_constructor(
             curr = i
 
     return path
+
+
+def trace_edges(
+    graph: Graph | CompactGraph,
+    edges: List[List[int]],
+    start: int,
+    search: str = "bfs",
+) -> List[Tuple[int, int]] | None:
+    """
+    Joins subgraph edge paths into a single path over the pixel graph from start,
+    returning its coordinates. Pixels already drawn are trimmed from both ends of
+    each edge path, and the pixel graph is only searched to connect the pen to the
+    next edge path when it isn't adjacent. Returns None if no connector is found.
+    """
+
+    if search not in GRAPH_SEARCHES:
+        raise ValueError(f"Unknown graph search: {search}")
+
+    path = [start]
+    drawn = {start}
+
+    for edge in edges:
+        first = 0
+        last = len(edge)
+        while first < last and edge[first] in drawn:
+            first += 1
+        while last > first and edge[last - 1] in drawn:
+            last -= 1
+
+        if first == last:
+            continue
+
+        if edge[first] not in graph.get_neighbors(path[-1]):
+            count("connectors")
+
+            connector = GRAPH_SEARCHES[search](graph, path[-1], edge[first])
+            if connector is None:
+                return None
+
+            path.extend(connector[1:-1])
+            drawn.update(connector)
+
+        path.extend(edge[first:last])
+        drawn.update(edge[first:last])
+
+    return list(map(tuple, np.asarray(graph.coords)[path].tolist()))
+
+
+@timed()
+def sweep_constructor(
+    graph: Graph | CompactGraph,
+    subgraph: Subgraph,
+    root: int,
+    screen,
+    search: str = "bfs",
+) -> List[Tuple[int, int]] | None:
+    """
+    Constructs a path in one pass over the cost tree of a subgraph, drawing the
+    subgraph path to each node in the order of dfs_priority_order.
+    """
+
+    tree = construct_tree(subgraph)
+    nodes = tree.nodes
+    children, ends = tree.child_order()
+
+    edges = []
+
+    # Pushed in reverse so the cheapest child is popped first
+    stack = children[ends[0] - 1 :: -1] if ends[0] else []
+
+    while stack:
+        curr = stack.pop()
+        stack.extend(reversed(children[ends[curr - 1] : ends[curr]]))
+
+        edges.append(subgraph.paths[nodes[tree.parent[curr]]][nodes[curr]])
+
+    return trace_edges(graph, edges, root, search)
+
+
+# Odd degree nodes are paired with, and swap partners through, this many of the
+# closest odd nodes still unpaired
+POSTMAN_PARTNERS = 8
+
+# Passes of partner swaps over every pair before the pairs are kept as they are
+POSTMAN_SWAP_PASSES = 4
+
+# Distances from this many sources times subgraph nodes are held at a time
+POSTMAN_CHUNK_CELLS = 1 << 22
+
+
+def chunked_dijkstra(graph: csr_matrix, sources: np.ndarray, **kwargs):
+    """
+    Runs dijkstra from a few sources at a time, so the distance rows held at once
+    stay within POSTMAN_CHUNK_CELLS, and yields the first source of each chunk with
+    its results.
+    """
+
+    step = max(1, POSTMAN_CHUNK_CELLS // graph.shape[0])
+    for start in range(0, len(sources), step):
+        yield start, dijkstra(
+            graph, directed=False, indices=sources[start : start + step], **kwargs
+        )
+
+
+def postman_pairs(subgraph: Subgraph, nodes: List[int]) -> List[List[int]]:
+    """
+    Pairs up the odd degree nodes of a subgraph by subgraph distance and returns
+    the subgraph path of each pair as a list of nodes. The farthest two are left
+    unpaired, so the walk over the subgraph with these paths doubled can start and
+    end at them.
+    """
+
+    position = {node: i for i, node in enumerate(nodes)}
+
+    index1 = []
+    index2 = []
+    lengths = []
+    odd = []
+    for node in nodes:
+        # A loop is one neighbour but adds two to the degree
+        if len(subgraph.edges[node]) + (node in subgraph.edges[node]) & 1:
+            odd.append(position[node])
+
+        for other, length in subgraph.edges[node].items():
+            if node < other:
+                index1.append(position[node])
+                index2.append(position[other])
+                lengths.append(length)
+
+    if len(odd) <= 2:
+        return []
+
+    graph = csr_matrix(
+        (np.array(lengths, dtype=np.float64), (index1, index2)),
+        shape=(len(nodes), len(nodes)),
+    )
+    odd = np.array(odd)
+
+    # Distances between odd nodes that are known, the close ones of each and every
+    # one from the nodes left over by the first round. Lengths are whole pixels, so
+    # the rows of the latter lose nothing as float32
+    between = [{} for _ in range(len(odd))]
+    far = {}
+
+    matched = np.zeros(len(odd), dtype=bool)
+    farthest = (-np.inf, 0, 0)
+    wanted = (len(odd) - 2) // 2
+    pairs = []
+    while len(pairs) < wanted:
+        left = np.flatnonzero(np.logical_not(matched))
+        partners = min(POSTMAN_PARTNERS, len(left) - 1)
+
+        rows = []
+        cols = []
+        candidates = []
+        for start, distances in chunked_dijkstra(graph, odd[left]):
+            distances = distances[:, odd]
+            if pairs:
+                far.update(zip(left[start:].tolist(), distances.astype(np.float32)))
+
+            distances = distances[:, left]
+            if not pairs:
+                # The farthest two are taken out before any pairing
+                row, col = np.unravel_index(np.argmax(distances), distances.shape)
+                if distances[row, col] > farthest[0]:
+                    farthest = (distances[row, col], start + row, col)
+
+            distances[np.arange(len(distances)), start + np.arange(len(distances))] = (
+                np.inf
+            )
+            closest = np.argpartition(distances, partners - 1, axis=1)[:, :partners]
+            rows.append(np.repeat(start + np.arange(len(distances)), partners))
+            cols.append(closest.ravel())
+            candidates.append(np.take_along_axis(distances, closest, axis=1).ravel())
+
+        rows = left[np.concatenate(rows)]
+        cols = left[np.concatenate(cols)]
+        candidates = np.concatenate(candidates)
+        if not pairs:
+            matched[left[farthest[1]]] = matched[left[farthest[2]]] = True
+
+        # Each close pair once, closest first
+        rows, cols = np.minimum(rows, cols), np.maximum(rows, cols)
+        _, unique = np.unique(rows * len(odd) + cols, return_index=True)
+        order = unique[np.lexsort((cols[unique], rows[unique], candidates[unique]))]
+
+        for length, row, col in zip(
+            candidates[order].tolist(), rows[order].tolist(), cols[order].tolist()
+        ):
+            between[row][col] = between[col][row] = length
+
+            if len(pairs) < wanted and not matched[row] and not matched[col]:
+                matched[row] = matched[col] = True
+                pairs.append((row, col))
+
+    def distance(a, b):
+        if b in between[a]:
+            return between[a][b]
+        if a in far:
+            return float(far[a][b])
+        if b in far:
+            return float(far[b][a])
+        return np.inf
+
+    pair_of = [-1] * len(odd)
+    for x, pair in enumerate(pairs):
+        for i in pair:
+            pair_of[i] = x
+
+    # Partners are swapped between two pairs while that shortens them, as the pairs
+    # of the later rounds can be far apart. Only the pairs holding a close node of
+    # either end are tried
+    for _ in range(POSTMAN_SWAP_PASSES):
+        improved = False
+
+        for x in range(len(pairs)):
+            for y in {pair_of[i] for node in pairs[x] for i in between[node]}:
+                if y == -1 or y == x:
+                    continue
+
+                a, b = pairs[x]
+                c, d = pairs[y]
+                length = distance(a, b) + distance(c, d)
+
+                if distance(a, c) + distance(b, d) < length:
+                    pairs[x], pairs[y] = (a, c), (b, d)
+                elif distance(a, d) + distance(b, c) < length:
+                    pairs[x], pairs[y] = (a, d), (b, c)
+                else:
+                    continue
+
+                improved = True
+                for i in pairs[x]:
+                    pair_of[i] = x
+                for i in pairs[y]:
+                    pair_of[i] = y
+
+        if not improved:
+            break
+
+    paths = []
+    for start, (_, predecessors) in chunked_dijkstra(
+        graph,
+        odd[[row for row, _ in pairs]],
+        limit=max(distance(row, col) for row, col in pairs),
+        return_predecessors=True,
+    ):
+        for i, (row, col) in enumerate(pairs[start : start + len(predecessors)]):
+            path = [odd[col]]
+            while path[-1] != odd[row]:
+                path.append(int(predecessors[i, path[-1]]))
+            paths.append([nodes[node] for node in path])
+
+    return paths
+
+
+@timed()
+def eulerian_constructor(
+    graph: Graph | CompactGraph,
+    subgraph: Subgraph,
+    root: int,
+    screen,
+    search: str = "bfs",
+) -> List[Tuple[int, int]] | None:
+    """
+    Constructs a path that draws every edge of a subgraph, doubling as little as it
+    can, as in the Chinese postman problem. The shortest subgraph paths between the
+    pairs from postman_pairs are added as extra edges, which leaves at most two odd
+    degree nodes, and an Eulerian walk from one of them covers every edge once.
+    """
+
+    nodes = list(subgraph.edges)
+
+    # Every edge of the walk is an index into ends, which holds its two nodes
+    ends = [
+        (node, other)
+        for node in nodes
+        for other in subgraph.edges[node]
+        if node <= other
+    ]
+    edge_count = len(ends)
+
+    for path in postman_pairs(subgraph, nodes):
+        ends.extend(zip(path, path[1:]))
+
+    count("doubled_edges", len(ends) - edge_count)
+
+    incident = {node: [] for node in nodes}
+    degree = dict.fromkeys(nodes, 0)
+    for i, (node, other) in enumerate(ends):
+        incident[node].append(i)
+        incident[other].append(i)
+        degree[node] += 1
+        degree[other] += 1
+
+    # The walk starts at one of the two odd degree nodes left, if there are any
+    start = next((node for node in nodes if degree[node] & 1), root)
+
+    # Hierholzer's algorithm, nodes are popped in reverse walk order once all their
+    # edges are used
+    used = [False] * len(ends)
+    walk = []
+    stack = [start]
+
+    while stack:
+        node = stack[-1]
+
+        while incident[node] and used[incident[node][-1]]:
+            incident[node].pop()
+
+        if incident[node]:
+            i = incident[node].pop()
+            used[i] = True
+
+            a, b = ends[i]
+            stack.append(b if a == node else a)
+        else:
+            stack.pop()
+            walk.append(node)
+
+    walk.reverse()
+
+    return trace_edges(
+        graph,
+        [subgraph.paths[a][b] for a, b in zip(walk, walk[1:])],
+        walk[0],
+        search,
+    )
+
+
+# Ways of ordering the nodes of a subgraph into a path over its pixel graph
+PATH_CONSTRUCTORS = {
+    "waypoints": path_constructor,
+    "sweep": sweep_constructor,
+    "eulerian": eulerian_constructor,
+}
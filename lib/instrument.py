@@ -0,0 +1,228 @@
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:  # Peak RSS is only sampled where the platform reports it
+    resource = None
+
+# Set to "1" to profile every run, or "memory" to also trace peak memory per span
+PROFILE_ENV = "LINUS_PROFILE"
+
+# Shared no-op context returned by timer() while profiling is disabled
+NULL_TIMER = nullcontext()
+
+# The active profiler, None while disabled
+_profiler = None
+
+
+class Span:
+    """
+    Aggregated timings of every entry into one named timer at one position in the
+    call tree.
+    """
+
+    __slots__ = ("name", "calls", "total", "peak", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total = 0.0
+        self.peak = 0
+        self.children = {}
+
+    def child(self, name: str) -> "Span":
+        if name not in self.children:
+            self.children[name] = Span(name)
+        return self.children[name]
+
+    def to_dict(self) -> dict:
+        report = {"name": self.name, "calls": self.calls, "total_s": self.total}
+        if self.peak:
+            report["peak_bytes"] = self.peak
+        report["children"] = [child.to_dict() for child in self.children.values()]
+        return report
+
+
+class Timer:
+    __slots__ = ("profiler", "span", "start", "peak")
+
+    def __init__(self, profiler: "Profiler", span: Span):
+        self.profiler = profiler
+        self.span = span
+
+    def __enter__(self):
+        profiler = self.profiler
+
+        if profiler.memory:
+            # Carry the peak so far up to the enclosing timer before resetting it
+            profiler.stack[-1].peak = max(
+                profiler.stack[-1].peak, tracemalloc.get_traced_memory()[1]
+            )
+            tracemalloc.reset_peak()
+            self.peak = 0
+
+        profiler.stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        profiler.stack.pop()
+
+        self.span.calls += 1
+        self.span.total += elapsed
+
+        if profiler.memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            self.span.peak = max(self.span.peak, self.peak)
+            profiler.stack[-1].peak = max(profiler.stack[-1].peak, self.peak)
+
+        return False
+
+
+class Profiler:
+    """
+    Collects nested timers and counters for one run. With memory set, the peak
+    traced Python allocation of each span is sampled too, at a large slowdown.
+    """
+
+    def __init__(self, name: str = "run", memory: bool = False):
+        self.memory = memory
+        self.root = Span(name)
+        self.counters = {}
+        self.start = time.perf_counter()
+
+        # The root is a Timer so spans always have a parent to report peaks to
+        root = Timer(self, self.root)
+        root.peak = 0
+        self.stack = [root]
+
+        if memory:
+            tracemalloc.start()
+
+    def timer(self, name: str) -> Timer:
+        return Timer(self, self.stack[-1].span.child(name))
+
+    def report(self) -> dict:
+        root = self.stack[0]
+        self.root.calls = 1
+        self.root.total = time.perf_counter() - self.start
+
+        if self.memory:
+            self.root.peak = max(root.peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        report = {"spans": self.root.to_dict(), "counters": dict(self.counters)}
+
+        if resource is not None:
+            # Kilobytes on Linux, bytes on macOS
+            report["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        return report
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+def enable(name: str = "run", memory: bool = False):
+    global _profiler
+    _profiler = Profiler(name, memory)
+
+
+def enable_from_env(name: str = "run") -> bool:
+    """
+    Enable profiling if the LINUS_PROFILE environment variable asks for it.
+    """
+
+    value = os.environ.get(PROFILE_ENV, "")
+    if value and value != "0":
+        enable(name, memory=value == "memory")
+
+    return enabled()
+
+
+def disable() -> dict | None:
+    """
+    Stop profiling and return the report of the run, or None if it was disabled.
+    """
+
+    global _profiler
+
+    if _profiler is None:
+        return None
+
+    report = _profiler.report()
+    _profiler = None
+    return report
+
+
+def timer(name: str):
+    """
+    Context manager timing a block under the enclosing timer.
+    """
+
+    if _profiler is None:
+        return NULL_TIMER
+    return _profiler.timer(name)
+
+
+def timed(name: str | None = None):
+    """
+    Decorator timing every call of a function, named after it by default.
+    """
+
+    def decorator(function):
+        span_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return function(*args, **kwargs)
+
+            with _profiler.timer(span_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name: str, value: int = 1):
+    if _profiler is not None:
+        _profiler.counters[name] = _profiler.counters.get(name, 0) + value
+
+
+def write_report(report: dict, output: str):
+    """
+    Write a report as JSON, with the spans also written as flamegraph folded stacks
+    next to it.
+    """
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    with open(os.path.splitext(output)[0] + ".folded", "w") as f:
+        f.write("\n".join(folded_stacks(report["spans"])) + "\n")
+
+
+def folded_stacks(span: dict, prefix: str = ""):
+    """
+    Yields flamegraph folded stack lines for a span report, with self time in
+    microseconds.
+    """
+
+    stack = f"{prefix};{span['name']}" if prefix else span["name"]
+    children = sum(child["total_s"] for child in span["children"])
+    yield f"{stack} {max(0, round((span['total_s'] - children) * 1e6))}"
+
+    for child in span["children"]:
+        yield from folded_stacks(child, stack)
@@ -0,0 +1,150 @@
+from lib.graph import MIN_PATH_LENGTH, build_pixel_graph
+from lib.skeleton import (
+    BLUR_KERNEL,
+    CANNY_THRESHOLDS,
+    DILATE_ITERATIONS,
+    DILATE_KERNEL,
+    RESIZE,
+    THIN_ITERATIONS,
+    blur_image,
+    detect_edges,
+    dilate_skeleton,
+    load_image,
+    reskeletonize,
+    thin_edges,
+)
+from lib.slicer import (
+    CLUSTER_EPS,
+    cluster_skeleton,
+    cluster_subgraph,
+    cluster_topologies,
+    join_paths,
+    subgraph_path,
+)
+
+
+def cluster_graphs(clusters, compact):
+    return [build_pixel_graph(cluster, compact=compact) for cluster in clusters]
+
+
+def cluster_subgraphs(clusters, graphs, min_path_length, topology):
+    return [
+        cluster_subgraph(graph, cluster, min_path_length, cluster_topology)
+        for cluster, graph, cluster_topology in zip(
+            clusters, graphs, cluster_topologies(clusters, topology, min_path_length)
+        )
+    ]
+
+
+def cluster_orders(graphs, subgraphs, search, constructor):
+    return [
+        (
+            None
+            if subgraph is None
+            else subgraph_path(graph, subgraph, None, search, constructor)
+        )
+        for graph, subgraph in zip(graphs, subgraphs)
+    ]
+
+
+def cluster_traversal(graphs, paths, search, path_graph):
+    kept = [(graph, path) for graph, path in zip(graphs, paths) if path]
+
+    return join_paths(
+        [graph for graph, _ in kept],
+        [path for _, path in kept],
+        None,
+        search,
+        path_graph,
+    )
+
+
+DEFAULT_PARAMS = {
+    "file_path": None,
+    "resize": RESIZE,
+    "blur_kernel": BLUR_KERNEL,
+    "canny_thresholds": CANNY_THRESHOLDS,
+    "thin_iterations": THIN_ITERATIONS,
+    "dilate_kernel": DILATE_KERNEL,
+    "dilate_iterations": DILATE_ITERATIONS,
+    "cluster_eps": CLUSTER_EPS,
+    "compact": False,
+    "min_path_length": MIN_PATH_LENGTH,
+    "topology": "walk",
+    "search": "bfs",
+    "constructor": "waypoints",
+    "path_graph": "dense",
+}
+
+# Each stage is its function, the stages it reads and the parameters it takes, both
+# passed to the function positionally in this order
+STAGES = {
+    "load": (load_image, (), ("file_path", "resize")),
+    "blur": (blur_image, ("load",), ("blur_kernel",)),
+    "edges": (detect_edges, ("blur",), ("canny_thresholds",)),
+    "thin": (thin_edges, ("edges",), ("thin_iterations",)),
+    "dilate": (dilate_skeleton, ("thin",), ("dilate_kernel", "dilate_iterations")),
+    "reskeletonize": (reskeletonize, ("dilate",), ()),
+    "cluster": (cluster_skeleton, ("reskeletonize",), ("cluster_eps",)),
+    "graph": (cluster_graphs, ("cluster",), ("compact",)),
+    "subgraph": (
+        cluster_subgraphs,
+        ("cluster", "graph"),
+        ("min_path_length", "topology"),
+    ),
+    "order": (cluster_orders, ("graph", "subgraph"), ("search", "constructor")),
+    "traversal": (cluster_traversal, ("graph", "order"), ("search", "path_graph")),
+}
+
+
+class Pipeline:
+    """
+    The image to traversal pipeline as explicit stages. Each stage keeps its last
+    result, keyed by its parameters and the keys of the stages it reads, so
+    changing a parameter only recomputes the stages downstream of it.
+    """
+
+    def __init__(self, **params):
+        self.params = dict(DEFAULT_PARAMS)
+        self.results = {}
+
+        # Stages recomputed since this was last cleared
+        self.computed = []
+
+        self.update(**params)
+
+    def update(self, **params):
+        unknown = set(params) - set(self.params)
+        if unknown:
+            raise ValueError(f"Unknown pipeline parameters: {sorted(unknown)}")
+
+        self.params.update(params)
+
+    def key(self, stage: str):
+        _, inputs, params = STAGES[stage]
+
+        return (
+            tuple(self.key(name) for name in inputs),
+            tuple(self.params[name] for name in params),
+        )
+
+    def run(self, stage: str = "traversal"):
+        """
+        Returns the output of a stage, recomputing it and anything upstream only if
+        their parameters changed.
+        """
+
+        function, inputs, params = STAGES[stage]
+        key = self.key(stage)
+
+        if stage in self.results and self.results[stage][0] == key:
+            return self.results[stage][1]
+
+        value = function(
+            *(self.run(name) for name in inputs),
+            *(self.params[name] for name in params),
+        )
+        self.results[stage] = (key, value)
+        self.computed.append(stage)
+
+        return value
@@ -0,0 +1,128 @@
+import numpy as np
+
+# Motor ticks per plotter unit, from pico/motor.h: 1/8 microstepping of a 200 step
+# motor at one revolution per unit, so velocities in units/s are in rps
+TICKS_PER_UNIT = 200 * 8
+
+# The step loop of pico/main.c pulses every motor behind its target for 5us then
+# waits 600us, so both axes step at once at a fixed rate with no acceleration ramp.
+# The max_velocity_rps and max_acceleration fields of StepperMotor are not used yet
+STEP_PERIOD_S = 605e-6
+STEP_VELOCITY = 1 / (STEP_PERIOD_S * TICKS_PER_UNIT)
+
+# Serial time per point of each protocol in lib/serial_com.py, and whether it
+# overlaps with moving. Each point of send_path waits for a 21 byte READY and sends
+# about 20 bytes at 115200 baud, 10 bits a byte, plus up to the 10ms poll of the
+# host loop, all while the motors stand still. The windowed protocol keeps the
+# Pico's ring buffer full while it moves, at 4.2 bytes a point
+COMMAND_OVERHEAD_S = {
+    "text": (41 * 10 / 115200 + 0.01, False),
+    "windowed": (4.2 * 10 / 115200, True),
+}
+
+# Skeleton pixels are 1/120 of a unit, as scaled in main.py. Path within a pixel of
+# ink drawn earlier counts as retrace
+RETRACE_RESOLUTION = 1 / 120
+
+
+class Plotter:
+    """
+    Kinematic model of the XY gantry for estimating plot time. As on the Pico,
+    each axis moves to its target on its own and both stop at every point before
+    the next. An axis accelerates at max_acceleration up to max_velocity, in units/s
+    and units/s^2, or moves at max_velocity throughout when max_acceleration is
+    None. Every point also costs command_overhead_s of serial traffic, which
+    either holds the motors still or, when pipelined, only limits how fast points
+    arrive.
+    """
+
+    def __init__(
+        self,
+        max_velocity: float = STEP_VELOCITY,
+        max_acceleration: float | None = None,
+        protocol: str = "text",
+        command_overhead_s: float | None = None,
+    ):
+        self.max_velocity = max_velocity
+        self.max_acceleration = max_acceleration
+
+        default_overhead, self.pipelined = COMMAND_OVERHEAD_S[protocol]
+        self.command_overhead_s = (
+            default_overhead if command_overhead_s is None else command_overhead_s
+        )
+
+    def move_times(self, points: np.ndarray) -> np.ndarray:
+        """
+        Seconds of each move from the origin through points.
+        """
+
+        # Targets are truncated to whole ticks as in set_target_position
+        ticks = np.trunc(np.vstack([(0, 0), points]) * TICKS_PER_UNIT)
+        distances = np.abs(np.diff(ticks, axis=0)) / TICKS_PER_UNIT
+
+        v, a = self.max_velocity, self.max_acceleration
+        if a is None:
+            times = distances / v
+        else:
+            # Triangular profile when the axis can't reach full speed, otherwise
+            # trapezoidal with v / a spent ramping at each end
+            times = np.where(
+                distances < v * v / a,
+                2 * np.sqrt(distances / a),
+                distances / v + v / a,
+            )
+
+        return times.max(axis=1)
+
+    def estimate(self, points) -> dict:
+        """
+        Estimated plot time of a path in plotter units, with its travel and the part
+        of that travel retracing ink already drawn, both in plotter units.
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        moves = self.move_times(points)
+
+        if self.pipelined:
+            steps = np.maximum(moves, self.command_overhead_s)
+        else:
+            steps = moves + self.command_overhead_s
+
+        return {
+            "points": len(points),
+            "time_s": float(steps.sum()),
+            "move_s": float(moves.sum()),
+            "travel": float(np.hypot(*np.diff(points, axis=0).T).sum()),
+            "retrace": retrace_length(points),
+        }
+
+
+def retrace_length(points: np.ndarray, resolution: float = RETRACE_RESOLUTION):
+    """
+    Length of a path over cells of a resolution sized grid that it already passed
+    through. The path is sampled every half cell, and a sample is retrace when its
+    cell was first reached more than two cells of travel earlier, so the cells a
+    stroke crosses as it turns a corner don't count.
+    """
+
+    if len(points) < 2:
+        return 0.0
+
+    segments = np.diff(points, axis=0)
+    lengths = np.hypot(*segments.T)
+    counts = np.maximum(np.ceil(lengths / (resolution / 2)).astype(np.int64), 1)
+
+    # Samples along every segment, excluding its start which ends the last one
+    segment = np.repeat(np.arange(len(segments)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    fraction = (offsets + 1) / counts[segment]
+
+    samples = points[segment] + fraction[:, None] * segments[segment]
+    steps = lengths[segment] / counts[segment]
+    travelled = np.cumsum(steps)
+
+    cells = np.floor(samples / resolution).astype(np.int64)
+    _, first, inverse = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+    first_reached = travelled[first][inverse.reshape(-1)]
+
+    return float(steps[travelled - first_reached > 2 * resolution].sum())
@@ -0,0 +1,157 @@
+import binascii
+import struct
+
+# Framing shared with pico/protocol.h, keep both in sync
+#
+# Host to Pico, a batch of points:
+#   SYNC 'P' seq:u16 count:u8 count * (x:i16 y:i16) checksum:u16
+# Host to Pico on every (re)connect, the seq of the next batch it will send, with
+# resume 0 to start a new path or 1 to continue one after acks may have been lost:
+#   SYNC 'R' seq:u16 resume:u16 checksum:u16
+# Pico to host, an ack of every batch up to seq with the ring buffer's free slots,
+# or a nak asking for everything from seq to be resent:
+#   SYNC 'A' seq:u16 free:u16 checksum:u16
+#   SYNC 'N' seq:u16 free:u16 checksum:u16
+#
+# Integers are little endian and the checksum is CRC-16/CCITT (polynomial 0x1021,
+# initial value 0xFFFF) over every byte after SYNC
+SYNC = 0xA5
+POINTS = ord("P")
+RESET = ord("R")
+ACK = ord("A")
+NAK = ord("N")
+
+# Points the Pico can buffer, and the most sent in one frame
+RING_POINTS = 256
+MAX_BATCH_POINTS = 32
+
+# Points are fixed point with 12 fractional bits, so plotter units in [0, 4] keep
+# a resolution well under one motor tick
+FIXED_POINT_SCALE = 4096
+
+SEQ_MASK = 0xFFFF
+
+ACK_STRUCT = struct.Struct("<BBHH")
+HEADER_STRUCT = struct.Struct("<BBHB")
+CHECKSUM_STRUCT = struct.Struct("<H")
+
+
+def crc16(data: bytes) -> int:
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def seq_after(a: int, b: int) -> bool:
+    """
+    Whether sequence number a comes after b, allowing for wraparound.
+    """
+
+    return a != b and ((a - b) & SEQ_MASK) < 0x8000
+
+
+def to_fixed(value: float) -> int:
+    fixed = round(value * FIXED_POINT_SCALE)
+    if not -0x8000 <= fixed < 0x8000:
+        raise ValueError(f"Point coordinate {value} is out of fixed point range")
+
+    return fixed
+
+
+def encode_points(seq: int, points) -> bytes:
+    """
+    Encode up to MAX_BATCH_POINTS (x, y) points in plotter units as a frame.
+    """
+
+    if not 0 < len(points) <= MAX_BATCH_POINTS:
+        raise ValueError(f"Frames hold 1 to {MAX_BATCH_POINTS} points")
+
+    body = HEADER_STRUCT.pack(SYNC, POINTS, seq & SEQ_MASK, len(points))
+    body += struct.pack(
+        f"<{2 * len(points)}h",
+        *(to_fixed(v) for point in points for v in (point[0], point[1])),
+    )
+
+    return body + CHECKSUM_STRUCT.pack(crc16(body[1:]))
+
+
+def decode_points(payload: bytes):
+    values = struct.unpack(f"<{len(payload) // 2}h", payload)
+
+    return [
+        (values[i] / FIXED_POINT_SCALE, values[i + 1] / FIXED_POINT_SCALE)
+        for i in range(0, len(values), 2)
+    ]
+
+
+def encode_reset(seq: int, resume: bool = False) -> bytes:
+    return encode_ack(RESET, seq, int(resume))
+
+
+def encode_ack(kind: int, seq: int, free: int) -> bytes:
+    body = ACK_STRUCT.pack(SYNC, kind, seq & SEQ_MASK, free)
+    return body + CHECKSUM_STRUCT.pack(crc16(body[1:]))
+
+
+class FrameParser:
+    """
+    Incremental parser for both directions of the protocol. Bytes are fed in as
+    they arrive and complete frames come out as (kind, seq, value) tuples, where
+    value is the free slot count of an ack or nak, the resume flag of a reset and
+    the points of a batch.
+    Corrupt frames are skipped by resyncing on the next SYNC byte, and counted.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.errors = 0
+
+    def feed(self, data: bytes):
+        self.buffer.extend(data)
+        frames = []
+
+        while True:
+            start = self.buffer.find(SYNC)
+            if start < 0:
+                self.buffer.clear()
+                break
+            del self.buffer[:start]
+
+            if len(self.buffer) < 2:
+                break
+
+            kind = self.buffer[1]
+            if kind in (ACK, NAK, RESET):
+                size = ACK_STRUCT.size + CHECKSUM_STRUCT.size
+            elif kind == POINTS:
+                if len(self.buffer) < HEADER_STRUCT.size:
+                    break
+                count = self.buffer[4]
+                if not 0 < count <= MAX_BATCH_POINTS:
+                    self.errors += 1
+                    del self.buffer[:1]
+                    continue
+                size = HEADER_STRUCT.size + 4 * count + CHECKSUM_STRUCT.size
+            else:
+                self.errors += 1
+                del self.buffer[:1]
+                continue
+
+            if len(self.buffer) < size:
+                break
+
+            frame = bytes(self.buffer[:size])
+            (checksum,) = CHECKSUM_STRUCT.unpack(frame[-2:])
+            if crc16(frame[1:-2]) != checksum:
+                self.errors += 1
+                del self.buffer[:1]
+                continue
+
+            del self.buffer[:size]
+
+            if kind == POINTS:
+                _, _, seq, _ = HEADER_STRUCT.unpack(frame[: HEADER_STRUCT.size])
+                frames.append((kind, seq, decode_points(frame[5:-2])))
+            else:
+                _, _, seq, free = ACK_STRUCT.unpack(frame[: ACK_STRUCT.size])
+                frames.append((kind, seq, free))
+
+        return frames
@@ -1,9 +1,25 @@
-import pygame
-from PIL import Image
+try:
+    import pygame
+except ImportError:  # Only needed to draw on a debug screen
+    pygame = None
+from itertools import islice
+from PIL import GifImagePlugin, Image
+import cv2
 import numpy as np
 from lib.graph import Subgraph
 import time
 
+# Pixels per plotter unit of previews, as scaled in main.py, and their size
+PREVIEW_SCALE = 120
+PREVIEW_SIZE = (480, 480)
+
+# Previews are palette images of the background, the drawn path and the pen
+PREVIEW_PALETTE = [0, 0, 0, 255, 0, 0, 0, 255, 0]
+BACKGROUND, PATH, PEN = 0, 1, 2
+
+LINE_THICKNESS = 2
+PEN_RADIUS = 2
+
 
 def draw_point(screen, coord, intersection=False):
     if screen is not None:
@@ -102,3 +118,180 @@ class PygameRecord:
         self.save()
         # Return False if you want exceptions to propagate, True to suppress them
         return False
+
+
+def preview_pixels(points, scale=PREVIEW_SCALE) -> np.ndarray:
+    """
+    Preview pixel (x, y) of points in plotter units. Points are (row, column), so
+    they swap as in main.render.
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return np.round(points[:, ::-1] * scale).astype(np.int32)
+
+
+def rasterize(points, size=PREVIEW_SIZE, scale=PREVIEW_SCALE) -> np.ndarray:
+    """
+    Draw a whole path in one cv2.polylines call, as a palette image.
+    """
+
+    canvas = np.full(size, BACKGROUND, dtype=np.uint8)
+    cv2.polylines(
+        canvas,
+        [preview_pixels(points, scale).reshape(-1, 1, 2)],
+        False,
+        PATH,
+        LINE_THICKNESS,
+    )
+
+    return canvas
+
+
+def palette_image(canvas: np.ndarray) -> Image.Image:
+    image = Image.fromarray(canvas, "P")
+    image.putpalette(PREVIEW_PALETTE)
+    return image
+
+
+def to_bgr(canvas: np.ndarray) -> np.ndarray:
+    return np.array(PREVIEW_PALETTE, dtype=np.uint8).reshape(-1, 3)[canvas, ::-1]
+
+
+class GifStream:
+    """
+    Writes a GIF to disk frame by frame. After the first, each frame is only the
+    rectangle that changed, drawn over the frames before it.
+    """
+
+    def __init__(self, filename: str, fps: int, size=PREVIEW_SIZE):
+        self.file = open(filename, "wb")
+        self.duration = round(1000 / fps)
+        self.size = size
+        self.frames = 0
+
+    def write(self, canvas: np.ndarray, box):
+        if self.frames == 0:
+            header, _ = GifImagePlugin.getheader(
+                palette_image(canvas), None, {"loop": 0}
+            )
+            self.file.write(b"".join(header))
+            x0, y0, x1, y1 = 0, 0, canvas.shape[1], canvas.shape[0]
+        else:
+            x0, y0, x1, y1 = box
+
+        frame = palette_image(np.ascontiguousarray(canvas[y0:y1, x0:x1]))
+        for data in GifImagePlugin.getdata(frame, (x0, y0), duration=self.duration):
+            self.file.write(data)
+
+        self.frames += 1
+
+    def close(self):
+        # The header comes with the first frame, so a path that drew nothing still
+        # gets the blank canvas to make a valid file
+        if self.frames == 0:
+            self.write(np.full(self.size, BACKGROUND, dtype=np.uint8), None)
+
+        self.file.write(b";")
+        self.file.close()
+
+
+class VideoStream:
+    """
+    Writes an MP4 to disk frame by frame with OpenCV.
+    """
+
+    def __init__(self, filename: str, fps: int, size=PREVIEW_SIZE):
+        self.writer = cv2.VideoWriter(
+            filename, cv2.VideoWriter_fourcc(*"mp4v"), fps, (size[1], size[0])
+        )
+        if not self.writer.isOpened():
+            raise ValueError(f"Could not open {filename} for writing")
+
+        self.frames = 0
+
+    def write(self, canvas: np.ndarray, box):
+        self.writer.write(to_bgr(canvas))
+        self.frames += 1
+
+    def close(self):
+        self.writer.release()
+
+
+class PreviewAnimation:
+    """
+    Animates a path being drawn to a .gif or .mp4 without a display. Each frame
+    draws only the points since the last one onto a single canvas and goes
+    straight to disk, so memory stays flat however long the path is.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        fps: int = 30,
+        points_per_frame: int = 30,
+        size=PREVIEW_SIZE,
+        scale=PREVIEW_SCALE,
+    ):
+        self.filename = filename
+        self.fps = fps
+        self.points_per_frame = points_per_frame
+        self.size = size
+        self.scale = scale
+
+    def open_stream(self):
+        if self.filename.lower().endswith(".gif"):
+            return GifStream(self.filename, self.fps, self.size)
+
+        return VideoStream(self.filename, self.fps, self.size)
+
+    def render(self, path) -> int:
+        """
+        Animate any iterable of points in plotter units, returning the frame count.
+        """
+
+        path = iter(path)
+        canvas = np.full(self.size, BACKGROUND, dtype=np.uint8)
+        stream = self.open_stream()
+
+        # Room around the changed points for the line and pen drawn over them
+        margin = max(LINE_THICKNESS, PEN_RADIUS) + 1
+        last = None
+
+        try:
+            while chunk := list(islice(path, self.points_per_frame)):
+                pixels = preview_pixels(chunk, self.scale)
+
+                if last is not None:
+                    # Color over the last pen position, as main.render does
+                    cv2.circle(canvas, tuple(map(int, last)), PEN_RADIUS, PATH, -1)
+                    pixels = np.vstack([last, pixels])
+
+                cv2.polylines(
+                    canvas, [pixels.reshape(-1, 1, 2)], False, PATH, LINE_THICKNESS
+                )
+                cv2.circle(canvas, tuple(map(int, pixels[-1])), PEN_RADIUS, PEN, -1)
+                last = pixels[-1]
+
+                x0, y0 = np.maximum(pixels.min(axis=0) - margin, 0)
+                x1, y1 = np.minimum(
+                    pixels.max(axis=0) + margin + 1, (self.size[1], self.size[0])
+                )
+                if x0 < x1 and y0 < y1:
+                    stream.write(canvas, (int(x0), int(y0), int(x1), int(y1)))
+        finally:
+            stream.close()
+
+        return stream.frames
+
+
+def render_preview(path, output: str, points_per_frame: int = 30):
+    """
+    Render a path without a display, animated to a .gif or .mp4 or as a single
+    image otherwise.
+    """
+
+    if output.lower().endswith((".gif", ".mp4")):
+        return PreviewAnimation(output, points_per_frame=points_per_frame).render(path)
+
+    cv2.imwrite(output, to_bgr(rasterize(list(path))))
+    return 1
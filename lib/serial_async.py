@@ -0,0 +1,324 @@
+import asyncio
+from collections import deque
+from itertools import islice
+
+import serial
+
+from lib.protocol import (
+    ACK,
+    MAX_BATCH_POINTS,
+    RING_POINTS,
+    SEQ_MASK,
+    FrameParser,
+    encode_points,
+    encode_reset,
+    seq_after,
+)
+from lib.serial_com import ACK_TIMEOUT_S, send_floats
+
+# Seconds between attempts to open the port, and for it to settle once open
+RECONNECT_DELAY_S = 2
+
+
+async def open_port(port):
+    """
+    Async counterpart of serial_com.initialize. The port is opened non-blocking so
+    reads are driven by the event loop, retrying until it opens.
+    """
+
+    while True:
+        try:
+            ser = serial.Serial(port, 115200, timeout=0)
+            await asyncio.sleep(RECONNECT_DELAY_S)
+            print("Serial port opened.")
+            return ser
+        except serial.SerialException as e:
+            print(f"Failed to open serial port: {e}")
+            await asyncio.sleep(RECONNECT_DELAY_S)
+
+
+class SerialStream:
+    """
+    Reads from a non-blocking serial port as the event loop reports its file
+    descriptor readable, so waiting on the Pico never polls or sleeps.
+    """
+
+    def __init__(self, ser):
+        self.ser = ser
+        self.fd = ser.fileno()
+        self.loop = asyncio.get_running_loop()
+        self.chunks = asyncio.Queue()
+        self.loop.add_reader(self.fd, self.readable)
+
+    def readable(self):
+        try:
+            data = self.ser.read(self.ser.in_waiting or 1)
+            if not data:
+                raise serial.SerialException("Port is readable but returned no data")
+        except (serial.SerialException, OSError) as e:
+            # Hand the error to the reader, the port is reopened by the sender
+            self.loop.remove_reader(self.fd)
+            data = e
+
+        self.chunks.put_nowait(data)
+
+    async def read(self, timeout=None) -> bytes:
+        """
+        The next bytes received, raising the port's error if it failed and
+        asyncio.TimeoutError if nothing arrives within timeout seconds.
+        """
+
+        chunk = await asyncio.wait_for(self.chunks.get(), timeout)
+        if isinstance(chunk, Exception):
+            raise chunk
+
+        return chunk
+
+    def write(self, data: bytes):
+        self.ser.write(data)
+
+    def close(self):
+        self.loop.remove_reader(self.fd)
+
+
+class PathProgress:
+    """
+    Points of a path pulled lazily from any iterable, so streamed slicing still
+    works. Points are kept from the last acknowledged one on, and acked counts the
+    points the Pico has taken, so a reconnect resumes from there.
+    """
+
+    def __init__(self, points, on_ack=None):
+        self.points = iter(points)
+        self.pending = deque()
+        self.acked = 0
+        self.on_ack = on_ack
+
+    def take(self, index: int, count: int):
+        """
+        Up to count points from point index on, fewer once the path runs out.
+        """
+
+        offset = index - self.acked
+        missing = offset + count - len(self.pending)
+        if missing > 0:
+            self.pending.extend(islice(self.points, missing))
+
+        return list(islice(self.pending, offset, offset + count))
+
+    def ack(self, index: int):
+        """
+        Mark every point before index as taken by the Pico.
+        """
+
+        while self.acked < index:
+            self.pending.popleft()
+            self.acked += 1
+
+        if self.on_ack is not None:
+            self.on_ack(self.acked)
+
+
+class TextSender:
+    """
+    The READY handshake of serial_com.send_path, one point per READY. A point is
+    acknowledged by the READY after it. The Pico says READY once and then waits,
+    so when its READY went to an earlier path or a dropped connection the next
+    point is sent straight away: the Pico is either waiting for it, or moves to
+    it again and answers READY.
+    """
+
+    def __init__(self, progress: PathProgress, waiting: bool = False):
+        self.progress = progress
+        # Whether the Pico may be waiting for a point without saying READY again
+        self.waiting = waiting
+
+    async def run(self, stream: SerialStream):
+        progress = self.progress
+        buffer = b""
+        sent = 0
+
+        if self.waiting:
+            for x, y in progress.take(progress.acked, 1):
+                send_floats(stream, x, y)
+                sent = 1
+        self.waiting = True
+
+        while True:
+            *lines, buffer = (buffer + await stream.read()).split(b"\n")
+
+            for line in lines:
+                line = line.decode("utf-8", errors="ignore").strip()
+                if not line:
+                    continue
+
+                print(f"Received: {line}")
+                if "READY" not in line:
+                    continue
+
+                progress.ack(progress.acked + sent)
+
+                point = progress.take(progress.acked, 1)
+                if not point:
+                    return
+
+                send_floats(stream, *point[0])
+                sent = 1
+
+
+class WindowedSender:
+    """
+    The batched binary protocol of serial_com.send_path_windowed. Every connection
+    starts with a reset frame carrying the seq of the first unacked point's frame,
+    so after a reconnect the Pico continues from the last acked point whether or
+    not it restarted, keeping frames whose acks were lost in the disconnect.
+    """
+
+    def __init__(self, progress: PathProgress, window: int = RING_POINTS):
+        self.progress = progress
+        self.window = window
+        # Seq of the frame holding the first unacked point
+        self.seq = 0
+        self.connected = False
+
+    async def run(self, stream: SerialStream):
+        progress = self.progress
+        parser = FrameParser()
+
+        # (seq, index after its last point, frame) of every frame sent but not acked
+        unacked = deque()
+        seq = self.seq
+        cursor = progress.acked
+
+        # Nothing is sent until the ack of the reset reports the free slots
+        resume = self.connected
+        self.connected = True
+        stream.write(encode_reset(seq, resume))
+        credit = 0
+        synced = False
+        done = False
+
+        while True:
+            # Fill the window, a partial batch only once the path runs out
+            while not done and credit > 0:
+                count = min(credit, MAX_BATCH_POINTS)
+                batch = progress.take(cursor, count)
+                done = len(batch) < count
+                if not batch:
+                    break
+
+                frame = encode_points(seq, batch)
+                stream.write(frame)
+                cursor += len(batch)
+                unacked.append((seq, cursor, frame))
+                seq = (seq + 1) & SEQ_MASK
+                credit -= len(batch)
+
+            if synced and done and not unacked:
+                return
+
+            # Only time out while waiting on an ack, a full ring just waits
+            try:
+                data = await stream.read(
+                    ACK_TIMEOUT_S if unacked or not synced else None
+                )
+            # Not the builtin TimeoutError before Python 3.11
+            except asyncio.TimeoutError:
+                print("Ack timed out, resending unacked frames.")
+                if not synced:
+                    stream.write(encode_reset(self.seq, resume))
+                for _, _, frame in unacked:
+                    stream.write(frame)
+                continue
+
+            for kind, ack_seq, free in parser.feed(data):
+                synced = True
+
+                # A nak acks everything before the frame it asks for
+                acked = ack_seq if kind == ACK else (ack_seq - 1) & SEQ_MASK
+                while unacked and not seq_after(unacked[0][0], acked):
+                    _, end, _ = unacked.popleft()
+                    progress.ack(end)
+                self.seq = unacked[0][0] if unacked else seq
+
+                credit = min(self.window, free) - (cursor - progress.acked)
+
+                if kind != ACK:
+                    for _, _, frame in unacked:
+                        stream.write(frame)
+
+
+async def send_path_async(
+    ser, port, pos_list, protocol="text", window=RING_POINTS, on_ack=None, ready=False
+):
+    """
+    Event driven send_path and send_path_windowed. The sender sleeps on the event
+    loop until the Pico answers, so other tasks such as preparing the next job run
+    meanwhile. on_ack(count) is called with the number of points acknowledged so
+    far, and after a serial error the port is reopened and sending resumes from
+    the last acknowledged point. ready is whether the Pico's READY already went to
+    an earlier path on this port. Returns the open port, which may be a new one.
+    """
+
+    progress = PathProgress(pos_list, on_ack)
+    if protocol == "windowed":
+        sender = WindowedSender(progress, window)
+    else:
+        sender = TextSender(progress, waiting=ready)
+
+    while True:
+        stream = SerialStream(ser)
+        try:
+            await sender.run(stream)
+            print(f"All {progress.acked} positions sent.")
+            return ser
+        except (serial.SerialException, OSError) as e:
+            print(f"Serial Error: {e}. Resuming from point {progress.acked}...")
+            stream.close()
+            try:
+                ser.close()
+            except (serial.SerialException, OSError):
+                pass
+            ser = await open_port(port)
+        finally:
+            stream.close()
+
+
+async def plot_path(port, pos_list, protocol="text"):
+    """
+    Open the port, send one path and close it again.
+    """
+
+    ser = await open_port(port)
+    try:
+        ser = await send_path_async(ser, port, pos_list, protocol)
+    finally:
+        ser.close()
+
+
+async def plot_jobs(port, jobs, prepare, protocol="text", executor=None):
+    """
+    Plot jobs one after another, running prepare(job) for the next job in the
+    executor while the current one plots. prepare returns the job's points in
+    plotter units. A process pool keeps slicing from holding the GIL the sender
+    needs, while None uses the event loop's default thread pool.
+    """
+
+    loop = asyncio.get_running_loop()
+    jobs = list(jobs)
+    if not jobs:
+        return
+
+    prepared = loop.run_in_executor(executor, prepare, jobs[0])
+    ser = await open_port(port)
+
+    try:
+        for i, job in enumerate(jobs):
+            points = await prepared
+            if i + 1 < len(jobs):
+                prepared = loop.run_in_executor(executor, prepare, jobs[i + 1])
+
+            print(f"Plotting {job}.")
+            ser = await send_path_async(ser, port, points, protocol, ready=i > 0)
+    finally:
+        ser.close()
@@ -1,5 +1,21 @@
 import serial
 import time
+from collections import deque
+from itertools import islice
+
+from lib.protocol import (
+    ACK,
+    MAX_BATCH_POINTS,
+    RING_POINTS,
+    SEQ_MASK,
+    FrameParser,
+    encode_points,
+    encode_reset,
+    seq_after,
+)
+
+# Unacked frames are resent after this long without an ack
+ACK_TIMEOUT_S = 0.5
 
 # A list of test commands to send to the pico.
 # This will eventually get replaced by a list of points that
@@ -35,7 +51,8 @@ def send_floats(ser, val1: float, val2: float):
     print(f"Sent: {msg.strip()}")
 
 def send_path(ser, port, pos_list):
-    curr = 0
+    # Any iterable works, so points can stream in from a generator while slicing
+    points = iter(pos_list)
     
     try:
         while True:
@@ -45,9 +62,9 @@ def send_path(ser, port, pos_list):
                     if line:
                         print(f"Received: {line}")
                         if "READY" in line:
-                            if curr < len(pos_list):
-                                send_floats(ser, pos_list[curr][0], pos_list[curr][1])
-                                curr += 1
+                            point = next(points, None)
+                            if point is not None:
+                                send_floats(ser, point[0], point[1])
                             else:
                                 print("All positions sent.")
                                 return
@@ -57,7 +74,7 @@ def send_path(ser, port, pos_list):
                     ser.close()
                 except:
                     pass
-                initialize(port)
+                ser = initialize(port)
             time.sleep(0.01)  # small delay to reduce CPU usage
 
     except KeyboardInterrupt:
@@ -65,3 +82,91 @@ def send_path(ser, port, pos_list):
             ser.close()
         print("UART closed.")
 
+def send_path_windowed(ser, port, pos_list, window=RING_POINTS):
+    """
+    Send points in batched binary frames, keeping up to window points in flight
+    and never more than the Pico's ring buffer has room for. Acks are cumulative
+    by sequence number, and on a nak or ack timeout every unacked frame is resent.
+    Every (re)connect starts with a reset frame, so the Pico continues from the
+    first unacked frame whether or not it restarted. See lib/protocol.py for the
+    framing.
+    """
+
+    points = iter(pos_list)
+    parser = FrameParser()
+
+    # (seq, frame, point count) of every frame sent but not acked
+    unacked = deque()
+    seq = 0
+    # Nothing is sent until the ack of the reset reports the free slots
+    ser.write(encode_reset(seq))
+    credit = 0
+    synced = False
+    resumed = False
+    done = False
+    sent = 0
+    last_ack = time.monotonic()
+
+    try:
+        while not done or unacked:
+            try:
+                # Fill the window, a partial batch only once the path runs out
+                while not done and credit > 0:
+                    batch = list(islice(points, min(credit, MAX_BATCH_POINTS)))
+                    if not batch:
+                        done = True
+                        break
+
+                    frame = encode_points(seq, batch)
+                    ser.write(frame)
+                    unacked.append((seq, frame, len(batch)))
+                    seq = (seq + 1) & SEQ_MASK
+                    credit -= len(batch)
+                    sent += len(batch)
+
+                # Blocks until a byte arrives or the port times out
+                for kind, ack_seq, free in parser.feed(ser.read(ser.in_waiting or 1)):
+                    last_ack = time.monotonic()
+                    synced = True
+
+                    # A nak acks everything before the frame it asks for
+                    acked = ack_seq if kind == ACK else (ack_seq - 1) & SEQ_MASK
+                    while unacked and not seq_after(unacked[0][0], acked):
+                        unacked.popleft()
+
+                    in_flight = sum(count for _, _, count in unacked)
+                    credit = min(window, free) - in_flight
+
+                    if kind != ACK:
+                        for _, frame, _ in unacked:
+                            ser.write(frame)
+
+                if (unacked or not synced) and time.monotonic() - last_ack > ACK_TIMEOUT_S:
+                    print("Ack timed out, resending unacked frames.")
+                    if not synced:
+                        ser.write(encode_reset(unacked[0][0] if unacked else seq, resumed))
+                    for _, frame, _ in unacked:
+                        ser.write(frame)
+                    last_ack = time.monotonic()
+            except (serial.SerialException, OSError) as e:
+                print(f"Serial Error: {e}. Reinitializing...")
+                try:
+                    ser.close()
+                except:
+                    pass
+                ser = initialize(port)
+                parser = FrameParser()
+                last_ack = time.monotonic()
+                ser.write(encode_reset(unacked[0][0] if unacked else seq, resume=True))
+                credit = 0
+                synced = False
+                resumed = True
+                for _, frame, _ in unacked:
+                    ser.write(frame)
+
+        print(f"All {sent} positions sent.")
+
+    except KeyboardInterrupt:
+        if ser:
+            ser.close()
+        print("UART closed.")
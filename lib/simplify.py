@@ -0,0 +1,119 @@
+import numpy as np
+
+from lib.instrument import count, timed
+
+# Points simplified at once when streaming, chunk ends are always kept so the
+# simplified path still passes through them
+STREAM_CHUNK_POINTS = 1024
+
+
+def merge_collinear(points: np.ndarray) -> np.ndarray:
+    """
+    Mask of the points to keep when dropping every point in the middle of a
+    straight run. Points where the path turns back on itself are kept.
+    """
+
+    keep = np.ones(len(points), dtype=bool)
+    if len(points) < 3:
+        return keep
+
+    before = points[1:-1] - points[:-2]
+    after = points[2:] - points[1:-1]
+
+    cross = before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0]
+    dot = (before * after).sum(axis=1)
+    scale = np.hypot(*before.T) * np.hypot(*after.T)
+
+    # Relative to the step lengths, so scaled coordinates still compare equal
+    keep[1:-1] = (np.abs(cross) > 1e-9 * scale) | (dot <= 0)
+
+    return keep
+
+
+def segment_distances(points: np.ndarray, start: np.ndarray, end: np.ndarray):
+    """
+    Distance of each point to the segment from start to end. Unlike the distance
+    to the line through them, this keeps the far end of a stroke that is traced
+    out and back.
+    """
+
+    direction = end - start
+    length = (direction**2).sum()
+
+    if length == 0:
+        t = np.zeros(len(points))
+    else:
+        t = np.clip(((points - start) @ direction) / length, 0, 1)
+
+    closest = start + t[:, None] * direction
+    return np.hypot(*(points - closest).T)
+
+
+def rdp(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Mask of the points Ramer-Douglas-Peucker keeps, so no point of the path is
+    further than tolerance from the simplified path. Each split measures every
+    point of its span at once.
+    """
+
+    keep = np.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return keep
+
+    keep[0] = keep[-1] = True
+
+    spans = [(0, len(points) - 1)]
+    while spans:
+        start, end = spans.pop()
+        if end - start < 2:
+            continue
+
+        distances = segment_distances(
+            points[start + 1 : end], points[start], points[end]
+        )
+        farthest = int(distances.argmax())
+
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            spans.append((start, split))
+            spans.append((split, end))
+
+    return keep
+
+
+@timed()
+def simplify(points, tolerance: float) -> np.ndarray:
+    """
+    Simplify a path in plotter units to within tolerance, merging straight runs
+    then running Ramer-Douglas-Peucker on what is left. Returns an (n, 2) array.
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+    merged = points[merge_collinear(points)]
+    simplified = merged[rdp(merged, tolerance)]
+
+    count("points_before_simplify", len(points))
+    count("points_after_simplify", len(simplified))
+
+    return simplified
+
+
+def simplify_stream(points, tolerance: float, chunk=STREAM_CHUNK_POINTS):
+    """
+    Simplify streamed points chunk by chunk, so points still reach the plotter
+    while slicing continues. Consecutive chunks share their end point.
+    """
+
+    buffer = []
+    for point in points:
+        buffer.append(point)
+
+        if len(buffer) > chunk:
+            simplified = simplify(buffer, tolerance)
+            yield from map(tuple, simplified[:-1].tolist())
+            buffer = buffer[-1:]
+
+    if buffer:
+        yield from map(tuple, simplify(buffer, tolerance).tolist())
@@ -2,47 +2,98 @@ import cv2
 import numpy as np
 from skimage.morphology import skeletonize, thin, medial_axis
 
+from lib.instrument import timed
 
-def gen_skel(file_path, output):
+# Images are resized to this square before processing
+RESIZE = (480, 480)
+
+BLUR_KERNEL = (5, 5)
+
+CANNY_THRESHOLDS = (50, 150)
+
+THIN_ITERATIONS = 10
+
+# Dilation connects small gaps in the skeleton before it is reskeletonized
+DILATE_KERNEL = (3, 3)
+DILATE_ITERATIONS = 3
+
+
+@timed()
+def load_image(file_path, resize=RESIZE):
     """
-    Generate a skeleton from an image file.
+    Load an image as grayscale and resize it to a square.
     """
 
-    # Load and resize image
     img = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
-    img = cv2.resize(img, (480, 480))  # Resize to square
+    return cv2.resize(img, resize)
+
+
+@timed()
+def blur_image(img, blur_kernel=BLUR_KERNEL):
+    """
+    Blur to reduce noise.
+    """
+
+    return cv2.GaussianBlur(img, blur_kernel, 0)
+
+
+@timed()
+def detect_edges(blurred, canny_thresholds=CANNY_THRESHOLDS):
+    """
+    Canny edges as a boolean image.
+    """
 
-    # Blur to reduce noise
-    blurred = cv2.GaussianBlur(img, (5, 5), 0)
+    edges = cv2.Canny(
+        blurred, threshold1=canny_thresholds[0], threshold2=canny_thresholds[1]
+    )
 
-    # Canny edges
-    edges = cv2.Canny(blurred, threshold1=50, threshold2=150)
+    return edges > 0
 
-    # Convert to binary boolean format for skeletonization
-    edges_bool = edges > 0
 
-    skeleton = medial_axis(edges_bool)
+@timed()
+def thin_edges(edges, thin_iterations=THIN_ITERATIONS):
+    return thin(edges, max_num_iter=thin_iterations)
 
-    # Thin image
-    skeleton = thin(edges_bool, max_num_iter=10)
+
+@timed()
+def dilate_skeleton(
+    skeleton, dilate_kernel=DILATE_KERNEL, dilate_iterations=DILATE_ITERATIONS
+):
+    """
+    Dilate slightly to connect small gaps in the skeleton.
+    """
 
     # Skeleton must be uint8 for OpenCV
     skeleton_uint8 = (skeleton * 255).astype(np.uint8)
 
     kernel = cv2.getStructuringElement(
-        cv2.MORPH_ELLIPSE, (3, 3)
+        cv2.MORPH_ELLIPSE, dilate_kernel
     )  # You can try (5,5) for more merging
 
-    # Dilate slightly to connect small gaps in the skeleton
-    dilated = cv2.dilate(skeleton_uint8, kernel, iterations=3)
+    return cv2.dilate(skeleton_uint8, kernel, iterations=dilate_iterations)
 
-    # Reskeletonize the dilated image
-    skeleton = skeletonize(dilated > 0)
-    # skeleton = medial_axis(dilated > 0)
 
-    skeleton_uint8 = (skeleton * 255).astype(np.uint8)
+@timed()
+def reskeletonize(dilated):
+    return skeletonize(dilated > 0)
+    # return medial_axis(dilated > 0)
+
+
+def save_skeleton(skeleton, output):
+    cv2.imwrite(output, (skeleton * 255).astype(np.uint8))
+
+
+@timed()
+def gen_skel(file_path, output):
+    """
+    Generate a skeleton from an image file.
+    """
+
+    img = load_image(file_path)
+    edges = detect_edges(blur_image(img))
+    skeleton = reskeletonize(dilate_skeleton(thin_edges(edges)))
 
     # Save the processed image skeleton to file
-    cv2.imwrite(output, skeleton_uint8)
+    save_skeleton(skeleton, output)
 
     return skeleton
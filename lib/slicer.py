@@ -1,12 +1,33 @@
-import copy
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
 import numpy as np
 from skimage.morphology import skeletonize, thin, medial_axis
+from scipy import ndimage
+from scipy.sparse import coo_matrix, issparse
+from scipy.sparse.csgraph import (
+    breadth_first_order,
+    connected_components,
+    minimum_spanning_tree,
+)
+from scipy.spatial import cKDTree
 from scipy.spatial.distance import cdist
-from sklearn.cluster import DBSCAN
 
 from lib.graph import *
+from lib.instrument import count, timed, timer
 from lib.render import *
 
+# Skeleton pixels closer than this are sliced as one cluster
+CLUSTER_EPS = 5
+
+# Backends of cluster_skeleton, which give the same clusters
+CLUSTER_METHODS = ("label", "dbscan")
+
+# Builders of the junction and dead end subgraph of each cluster: "walk" follows
+# the pixel graph from the first pixel, "junction" classifies pixels by their
+# neighbourhood and traces every branch at once
+TOPOLOGIES = ("walk", "junction")
+
 
 def path_dist(a, b):
     """
@@ -32,29 +53,252 @@ def path_dist(a, b):
     return min_distance, nearest_point_in_A, nearest_point_in_B
 
 
-def prim_mst(matrix):
-    num_nodes = matrix.shape[0]
-    selected = [False] * num_nodes
-    parent = [-1] * num_nodes
-    key = [float("inf")] * num_nodes
+def nearest_pair(A, B, tree_b):
+    """
+    Find the closest pair of points between A and B using a KD-tree over B. Ties
+    resolve to the lowest index in A and then in B, as the argmin over a full
+    cdist matrix would.
+    """
+
+    _, idx = tree_b.query(A)
+
+    # Exact integer distances, so equal distances compare equal
+    i = int(np.argmin(((A - B[idx]) ** 2).sum(axis=1)))
+
+    row = np.sqrt(((B - A[i]) ** 2).sum(axis=1))
+    j = int(np.argmin(row))
+
+    return row[j], A[i], B[j]
+
+
+# Pairs of paths with fewer point pairs than this use a plain cdist matrix,
+# which is cheaper than building and querying a KD-tree
+CDIST_MAX_PAIRS = 4096
+
+
+def pair_distance(arrays, trees, i, j):
+    """
+    Smallest distance and nearest points between paths i and j. KD-trees are
+    built on first use and cached in trees.
+    """
+
+    if len(arrays[i]) * len(arrays[j]) <= CDIST_MAX_PAIRS:
+        return path_dist(arrays[i], arrays[j])
+
+    if j not in trees:
+        trees[j] = cKDTree(arrays[j])
+
+    return nearest_pair(arrays[i], arrays[j], trees[j])
+
+
+@timed()
+def path_distances(paths):
+    """
+    Calculate the smallest distance and nearest points between every pair of paths.
+    Each path gets one KD-tree, so a pair costs a tree query per point instead of
+    a full pairwise distance matrix. Matches calling path_dist on every pair.
+    """
+
+    arrays = [np.array(path) for path in paths]
+    trees = {}
+
+    path_dist_matrix = np.zeros((len(paths), len(paths)))
+    nearest_points = {}
+
+    for i in range(len(paths)):
+        for j in range(i):
+            path_dist_matrix[i][j], nearest_a, nearest_b = pair_distance(
+                arrays, trees, i, j
+            )
+            path_dist_matrix[j][i] = path_dist_matrix[i][j]
+
+            nearest_points[(i, j)] = (nearest_a, nearest_b)
+            nearest_points[(j, i)] = (nearest_b, nearest_a)
+
+    return path_dist_matrix, nearest_points
+
+
+# Paths whose bounding boxes are checked per batch, and how many of the closest
+# boxes are tried before sorting a whole row
+BOX_BATCH = 256
+BOX_CANDIDATES = 16
+
+
+def box_distances(lows, highs, rows):
+    """
+    Lower bound on the distance from each path in rows to every path, from their
+    bounding boxes. lows and highs hold one row per axis.
+    """
+
+    total = None
+    for low, high in zip(lows, highs):
+        gap = np.maximum(
+            low[None, :] - high[rows, None], low[rows, None] - high[None, :]
+        )
+        np.maximum(gap, 0, out=gap)
+        gap *= gap
+
+        total = gap if total is None else total + gap
+
+    # Shrink slightly so float32 rounding never lifts the bound above the distance
+    return np.sqrt(total) * np.float32(1 - 1e-5)
+
+
+def scan_boxes(i, order, bounds, best, distance):
+    """
+    Measures paths in order of their bounding box distance from path i until the
+    box bound exceeds the best distance found. Returns the best (distance, low,
+    high) edge, and whether the scan stopped before running out of paths.
+    """
+
+    for j in order.tolist():
+        if bounds[j] == np.inf or (best is not None and bounds[j] > best[0]):
+            return best, True
+
+        edge = distance(i, j)
+        if best is None or edge < best:
+            best = edge
+
+    return best, False
+
+
+@timed()
+def path_candidate_graph(paths):
+    """
+    Calculate nearest points only between the pairs of paths needed to find the
+    MST over paths, using Boruvka's algorithm: each round finds the closest path
+    outside every component and merges along those edges. Candidates are tried in
+    order of their bounding box distance and skipped once that lower bound exceeds
+    the best distance found, so each path only measures a few neighbours.
+    Returns the measured distances as a sparse matrix.
+    """
+
+    arrays = [np.array(path) for path in paths]
+    trees = {}
+
+    lows = np.array([array.min(axis=0) for array in arrays], dtype=np.float32).T.copy()
+    highs = np.array([array.max(axis=0) for array in arrays], dtype=np.float32).T.copy()
+
+    distances = {}
+    nearest_points = {}
+
+    def distance(i, j):
+        high, low = max(i, j), min(i, j)
+
+        if (high, low) not in distances:
+            distances[(high, low)], nearest_a, nearest_b = pair_distance(
+                arrays, trees, high, low
+            )
+
+            nearest_points[(high, low)] = (nearest_a, nearest_b)
+            nearest_points[(low, high)] = (nearest_b, nearest_a)
+
+        return (distances[(high, low)], low, high)
+
+    component = np.arange(len(paths))
+
+    # Shortest known edge from each path out of its component, as
+    # (distance, low, high). It stays valid until its far end joins the component.
+    nearest = [None] * len(paths)
+
+    while len(np.unique(component)) > 1:
+        stale = [
+            i
+            for i in range(len(paths))
+            if nearest[i] is None
+            or component[nearest[i][1]] == component[nearest[i][2]]
+        ]
+
+        for start in range(0, len(stale), BOX_BATCH):
+            rows = np.array(stale[start : start + BOX_BATCH])
+
+            bounds = box_distances(lows, highs, rows)
+            bounds[component[None, :] == component[rows, None]] = np.inf
+
+            k = min(BOX_CANDIDATES, len(paths))
+            closest = np.argpartition(bounds, k - 1, axis=1)[:, :k]
 
-    key[0] = 0  # Start from node 0
+            for row, i in enumerate(rows.tolist()):
+                order = closest[row][
+                    np.argsort(bounds[row][closest[row]], kind="stable")
+                ]
+                best, finished = scan_boxes(i, order, bounds[row], None, distance)
 
-    for _ in range(num_nodes):
-        # Pick the minimum key vertex not yet included
-        u = min((i for i in range(num_nodes) if not selected[i]), key=lambda x: key[x])
-        selected[u] = True
+                if not finished:
+                    # Every close box was worth measuring, so go through the rest.
+                    # Boxes tied with the farthest close one may fall on either
+                    # side of the partition, so the rest are the paths not in it
+                    rest = np.ones(len(paths), dtype=bool)
+                    rest[closest[row]] = False
+                    order = np.flatnonzero(rest)
+                    order = order[np.argsort(bounds[row][order], kind="stable")]
+                    best, _ = scan_boxes(i, order, bounds[row], best, distance)
 
-        # Update key and parent for adjacent vertices
-        for v in range(num_nodes):
-            if matrix[u][v] != 0 and not selected[v] and matrix[u][v] < key[v]:
-                key[v] = matrix[u][v]
-                parent[v] = u
+                nearest[i] = best
+
+        # Shortest edge leaving each component
+        best = {}
+        for i in range(len(paths)):
+            c = component[i]
+            if c not in best or nearest[i] < best[c]:
+                best[c] = nearest[i]
+
+        for _, i, j in best.values():
+            old, new = component[i], component[j]
+            component[component == old] = new
+
+    keys = np.array(list(distances.keys()), dtype=np.int64).reshape(-1, 2)
+    values = np.array(list(distances.values()), dtype=float)
+
+    rows = np.concatenate((keys[:, 0], keys[:, 1]))
+    cols = np.concatenate((keys[:, 1], keys[:, 0]))
+    path_dist_matrix = coo_matrix(
+        (np.concatenate((values, values)), (rows, cols)), shape=(len(paths), len(paths))
+    ).tocsr()
+
+    return path_dist_matrix, nearest_points
+
+
+PATH_GRAPHS = {
+    "dense": path_distances,
+    "sparse": path_candidate_graph,
+}
+
+
+@timed()
+def prim_mst(matrix):
+    """
+    Minimum spanning tree over paths, returned as (parent, child) edges of the tree
+    rooted at node 0, ordered by child. Takes a symmetric distance matrix, either
+    dense, where every off-diagonal entry is an edge, or sparse, where only stored
+    entries are edges. The tree is found with scipy's csgraph, so large path
+    counts stay fast.
+    """
+
+    num_nodes = matrix.shape[0]
+
+    # Every spanning tree has the same number of edges, so shifting all weights
+    # by one keeps the same tree while zero distances between touching paths
+    # are no longer mistaken for missing edges. Only the upper triangle is kept,
+    # as the graph is undirected.
+    if issparse(matrix):
+        graph = matrix.tocoo()
+        keep = graph.row < graph.col
+        graph = coo_matrix(
+            (graph.data[keep] + 1, (graph.row[keep], graph.col[keep])),
+            shape=matrix.shape,
+        )
+    else:
+        graph = np.triu(np.array(matrix, dtype=float) + 1, k=1)
+
+    tree = minimum_spanning_tree(graph)
+    _, parent = breadth_first_order(tree, 0, directed=False, return_predecessors=True)
 
     # Build list of MST edges
     mst_edges = []
-    for v in range(1, num_nodes):
-        mst_edges.append((parent[v], v))
+    for v, u in enumerate(parent.tolist()):
+        if v > 0 and u >= 0:
+            mst_edges.append((u, v))
     return mst_edges
 
 
@@ -75,85 +319,375 @@ def dfs_traversal(adj, start=0, visited=None, path=None):
     visited[start] = True
     path.append(start)
 
-    for neighbor in adj[start]:
-        if not visited[neighbor]:
-            dfs_traversal(adj, neighbor, visited, path)
+    # Explicit stack of (node, remaining neighbours) instead of recursion
+    stack = [(start, iter(adj[start]))]
+
+    while stack:
+        node, neighbors = stack[-1]
+
+        for neighbor in neighbors:
+            if not visited[neighbor]:
+                visited[neighbor] = True
+                path.append(neighbor)
+                stack.append((neighbor, iter(adj[neighbor])))
+                break
+        else:
+            stack.pop()
+
             # Optional: include backtracking step if you want explicit path
-            path.append(start)
+            if stack:
+                path.append(stack[-1][0])
 
     return path
 
 
-def slice(skeleton, screen):
+@timed()
+def cluster_skeleton(skeleton, eps: float = CLUSTER_EPS, method: str = "label"):
+    """
+    Splits skeleton pixels into clusters of pixels chained together by steps of at
+    most eps, largest first. Ties keep the order of each cluster's first pixel, and
+    pixels within a cluster stay in row-major order, so both methods agree exactly.
+    """
+
+    if method not in CLUSTER_METHODS:
+        raise ValueError(f"Unknown cluster method: {method}")
+
     # Get all skeleton coordinates
     coords = np.column_stack(np.where(skeleton))
 
-    # DBSCAN clustering on coordinates
-    dbscan = DBSCAN(eps=5, min_samples=1)
-    dbscan.fit(coords)
-    labels = dbscan.labels_
-    unique_labels = np.unique(labels)
-    clusters = []
-    for label in unique_labels:
-        cluster_coords = coords[labels == label]
-        clusters.append(cluster_coords)
+    if method == "dbscan":
+        # Imported here so scikit-learn stays off the default path
+        from sklearn.cluster import DBSCAN
+
+        labels = DBSCAN(eps=eps, min_samples=1).fit(coords).labels_
+    else:
+        labels = label_skeleton(np.asarray(skeleton) != 0, eps)
+
+    # Number clusters by their first pixel, then group pixels with one stable sort
+    _, first, labels = np.unique(labels, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first)] = np.arange(len(first))
+    labels = rank[labels.reshape(-1)]
+
+    order = np.argsort(labels, kind="stable")
+    sizes = np.bincount(labels)
+    clusters = np.split(coords[order], np.cumsum(sizes)[:-1])
+
     # Sort clusters by size
     clusters.sort(key=len, reverse=True)
 
-    graphs = []
+    count("clusters", len(clusters))
 
-    paths = []
+    return clusters
 
-    traversal = []
 
-    for cluster in clusters:
-        dists = cdist(cluster, cluster)
+@lru_cache
+def cluster_structure(eps: float):
+    """
+    The disk to dilate skeletons by and the connectivity to label them with, so
+    that labelling joins pixels only by steps of at most eps. Also returns the
+    steps of at most eps it misses, one of each opposite pair.
+    """
+
+    radius = int(eps) + 1
+    y, x = np.mgrid[-2 * radius - 1 : 2 * radius + 2, -2 * radius - 1 : 2 * radius + 2]
+    within = x * x + y * y <= eps * eps
+
+    best = None
+    for disk_radius in range(radius + 1):
+        for rank in (1, 2):
+            dy, dx = np.mgrid[
+                -disk_radius : disk_radius + 1, -disk_radius : disk_radius + 1
+            ]
+            disk = dx * dx + dy * dy <= disk_radius * disk_radius
+            connectivity = ndimage.generate_binary_structure(2, rank)
+
+            # Steps joined by labelling: two disks overlapping or touching
+            origin = np.zeros_like(within)
+            origin[origin.shape[0] // 2, origin.shape[1] // 2] = True
+            joined = ndimage.binary_dilation(origin, disk)
+            joined = ndimage.binary_dilation(joined, disk)
+            joined = ndimage.binary_dilation(joined, connectivity)
+
+            if (joined & ~within).any():
+                continue
+            if best is None or joined.sum() > best[2].sum():
+                best = (disk, connectivity, joined)
+
+    disk, connectivity, joined = best
 
-        graphs.append(Graph(cluster))
+    center = within.shape[0] // 2
+    missed = [
+        (int(dy), int(dx))
+        for dy, dx in np.argwhere(within & ~joined) - center
+        if (dy, dx) > (0, 0)
+    ]
 
-        for i in range(len(cluster)):
-            # Get all indices less than 2
-            indices = np.where(dists[i] <= 2**0.5)[0]
+    return disk, connectivity, missed
 
-            for j in indices:
-                if j != i and (int(j), float(dists[i][j])) not in graphs[
-                    -1
-                ].get_neighbors(i):
-                    graphs[-1].add_edge(int(i), int(j))
 
-        root = 0
+def label_skeleton(skeleton: np.ndarray, eps: float) -> np.ndarray:
+    """
+    Cluster label of every skeleton pixel in row-major order, from connected
+    components of the skeleton dilated by about eps / 2. The few steps of at most
+    eps the dilation can't join without also joining longer ones are found by
+    shifting the skeleton over itself, and their components merged.
+    """
+
+    disk, connectivity, missed = cluster_structure(eps)
+
+    labels, n = ndimage.label(ndimage.binary_dilation(skeleton, disk), connectivity)
+
+    height, width = skeleton.shape
+    pairs = []
+    for dy, dx in missed:
+        # No two pixels are this far apart on a small canvas
+        if abs(dy) >= height or abs(dx) >= width:
+            continue
+
+        a = labels[max(0, -dy) : height - max(0, dy), max(0, -dx) : width - max(0, dx)]
+        b = labels[max(0, dy) : height + min(0, dy), max(0, dx) : width + min(0, dx)]
+        both = (
+            skeleton[
+                max(0, -dy) : height - max(0, dy), max(0, -dx) : width - max(0, dx)
+            ]
+            & skeleton[
+                max(0, dy) : height + min(0, dy), max(0, dx) : width + min(0, dx)
+            ]
+        )
+        pairs.append(np.column_stack([a[both], b[both]]))
+
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+
+    if len(pairs):
+        merges = coo_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n + 1, n + 1)
+        )
+        _, components = connected_components(merges, directed=False)
+        labels = components[labels]
+
+    return labels[skeleton]
+
+
+def cluster_topologies(
+    clusters, topology: str = "walk", min_path_length: int = MIN_PATH_LENGTH
+):
+    """
+    Subgraphs of junctions and dead ends of every cluster, before they are reduced.
+    With the "junction" topology they are built for all clusters in one vectorized
+    pass, while "walk" leaves each to cluster_subgraph to walk on its own, as None.
+    Dead ends of at most min_path_length pixels are dropped either way.
+    """
+
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology: {topology}")
+
+    if topology == "junction":
+        return junction_subgraphs(clusters, min_path_length)
+
+    return [None] * len(clusters)
+
+
+def cluster_subgraph(
+    graph,
+    cluster,
+    min_path_length: int = MIN_PATH_LENGTH,
+    topology: Subgraph | None = None,
+):
+    """
+    Reduces the pixel graph of a cluster to its intersections and dead ends, from
+    its topology out of cluster_topologies or by walking the graph when that is
+    None. Returns None if the cluster has no usable topology.
+    """
 
-        graph = copy.deepcopy(graphs[-1])
+    root = 0
 
-        try:
-            subgraph: Subgraph = reduce_subgraph(
-                intersection_subgraph(graphs[-1], Subgraph(cluster), root, root, set()),
-                root,
+    try:
+        if topology is None:
+            topology = intersection_subgraph(
+                graph, Subgraph(cluster), root, root, set(), min_path_length
             )
 
-            # draw_subgraph(screen, subgraph)
+        return reduce_subgraph(topology, root)
+    except:
+        return None
+
+
+def subgraph_path(
+    graph, subgraph, screen, search: str = "bfs", constructor: str = "waypoints"
+):
+    """
+    Orders the nodes of a cluster subgraph into a single path over its pixel graph,
+    with constructor chosen from PATH_CONSTRUCTORS. Returns None if no path could
+    be built.
+    """
+
+    if constructor not in PATH_CONSTRUCTORS:
+        raise ValueError(f"Unknown path constructor: {constructor}")
+
+    root = 0
+
+    # draw_subgraph(screen, subgraph)
+
+    try:
+        return PATH_CONSTRUCTORS[constructor](graph, subgraph, root, screen, search)
+    except:
+        return None
+
+
+def trace_cluster(
+    graph,
+    cluster,
+    screen,
+    search: str = "bfs",
+    min_path_length: int = MIN_PATH_LENGTH,
+    topology: Subgraph | None = None,
+    constructor: str = "waypoints",
+):
+    """
+    Traces a single path over one cluster of skeleton pixels. Returns None if the
+    cluster has no usable topology.
+    """
+
+    subgraph = cluster_subgraph(graph, cluster, min_path_length, topology)
+
+    if subgraph is None:
+        return None
+
+    return subgraph_path(graph, subgraph, screen, search, constructor)
+
+
+def cluster_path(
+    cluster,
+    compact: bool = False,
+    search: str = "bfs",
+    topology: str = "walk",
+    constructor: str = "waypoints",
+):
+    """
+    Worker entry point for parallel slicing. Takes a cluster as a coordinate array
+    and returns its path as an N x 2 int32 array, or None, so only compact arrays
+    cross the process boundary.
+    """
+
+    path = trace_cluster(
+        build_pixel_graph(cluster, compact=compact),
+        cluster,
+        None,
+        search,
+        topology=cluster_topologies([cluster], topology)[0],
+        constructor=constructor,
+    )
+
+    if not path:
+        return None
+
+    return np.array(path, dtype=np.int32).reshape(-1, 2)
+
+
+def cluster_paths(
+    clusters,
+    compact: bool,
+    search: str,
+    workers: int,
+    topology: str = "walk",
+    constructor: str = "waypoints",
+):
+    """
+    Traces every cluster across a process pool. Results come back in cluster order,
+    so the output is identical to tracing them one by one.
+    """
+
+    clusters = [np.ascontiguousarray(cluster, dtype=np.int32) for cluster in clusters]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            cluster_path,
+            clusters,
+            [compact] * len(clusters),
+            [search] * len(clusters),
+            [topology] * len(clusters),
+            [constructor] * len(clusters),
+        )
+
+        for cluster, path in zip(clusters, results):
+            if path is None:
+                yield cluster, None
+            else:
+                yield cluster, [tuple(point) for point in path.tolist()]
+
+
+@timed()
+def slice(
+    skeleton,
+    screen,
+    compact: bool = False,
+    search: str = "bfs",
+    path_graph: str = "dense",
+    workers: int = 1,
+    topology: str = "walk",
+    constructor: str = "waypoints",
+):
+    clusters = cluster_skeleton(skeleton)
+
+    graphs = []
+
+    paths = []
 
-            path = path_constructor(graph, subgraph, root, screen)
-            graphs[-1] = graph
+    if workers > 1 and len(clusters) > 1:
+        # Graphs are rebuilt here for the connector searches between paths. Work
+        # done inside the pool is timed as a whole, its counters are not collected
+        with timer("cluster_paths"):
+            for cluster, path in cluster_paths(
+                clusters, compact, search, workers, topology, constructor
+            ):
+                if path:
+                    graphs.append(build_pixel_graph(cluster, compact=compact))
+                    paths.append(path)
+    else:
+        topologies = cluster_topologies(clusters, topology)
+
+        for cluster, cluster_topology in zip(clusters, topologies):
+            # intersection_subgraph leaves the graph intact, so it is shared with
+            # the path constructor and the connector searches below
+            graph = build_pixel_graph(cluster, compact=compact)
+            path = trace_cluster(
+                graph,
+                cluster,
+                screen,
+                search,
+                topology=cluster_topology,
+                constructor=constructor,
+            )
 
             if path:
+                graphs.append(graph)
                 paths.append(path)
-        except:
-            pass
 
-    path_dist_matrix = np.zeros((len(paths), len(paths)))
-    nearest_points = {}
+    count("paths", len(paths))
 
-    for i in range(len(paths)):
-        for j in range(len(paths)):
-            if i <= j:
-                continue
+    traversal = join_paths(graphs, paths, screen, search, path_graph)
 
-            path_dist_matrix[i][j], nearest_a, nearest_b = path_dist(paths[i], paths[j])
-            path_dist_matrix[j][i] = path_dist_matrix[i][j]
+    count("points", len(traversal))
 
-            nearest_points[(i, j)] = (nearest_a, nearest_b)
-            nearest_points[(j, i)] = (nearest_b, nearest_a)
+    return traversal
+
+
+@timed()
+def join_paths(graphs, paths, screen, search: str = "bfs", path_graph: str = "dense"):
+    """
+    Orders the paths of every cluster along a minimum spanning tree and joins them
+    into one traversal, walking each pixel graph to reach the next jump.
+    """
+
+    traversal = []
+
+    # Nothing to order with fewer than two paths
+    if len(paths) < 2:
+        return [point for path in paths for point in path]
+
+    path_dist_matrix, nearest_points = PATH_GRAPHS[path_graph](paths)
 
     mst = prim_mst(path_dist_matrix)
     adj_matrix = build_adjacency_list(mst, len(paths))
@@ -161,7 +695,8 @@ def slice(skeleton, screen):
 
     visited = set()
 
-    for i in range(len(opt_order) - 2):
+    # The loop breaks once the last new path is added, so every path is reached
+    for i in range(len(opt_order) - 1):
 
         a = opt_order[i]
         b = opt_order[i + 1]
@@ -175,7 +710,7 @@ def slice(skeleton, screen):
                 break
 
             sp = shortest_graph_path_coords(
-                graphs[a], paths[a][-1], nearest_points[(a, b)][0], screen
+                graphs[a], paths[a][-1], nearest_points[(a, b)][0], screen, search
             )
             if sp:
                 traversal.extend(sp)
@@ -186,6 +721,7 @@ def slice(skeleton, screen):
                     nearest_points[(opt_order[i - 1], a)][1],
                     nearest_points[(a, b)][0],
                     screen,
+                    search,
                 )
                 if sp:
                     traversal.extend(sp)
@@ -193,3 +729,84 @@ def slice(skeleton, screen):
         traversal.append(nearest_points[(a, b)][1])
 
     return traversal
+
+
+def centroid_order(clusters):
+    """
+    Greedy nearest neighbour tour over cluster centroids, starting from the largest
+    cluster. A cheap stand-in for the MST order that needs no traced paths.
+    """
+
+    centroids = np.array([cluster.mean(axis=0) for cluster in clusters])
+    remaining = np.ones(len(clusters), dtype=bool)
+
+    order = [0]
+    remaining[0] = False
+
+    for _ in range(len(clusters) - 1):
+        distances = ((centroids - centroids[order[-1]]) ** 2).sum(axis=1)
+        distances[~remaining] = np.inf
+
+        nearest = int(np.argmin(distances))
+        order.append(nearest)
+        remaining[nearest] = False
+
+    return order
+
+
+def slice_stream(
+    skeleton,
+    screen,
+    compact: bool = False,
+    search: str = "bfs",
+    topology: str = "walk",
+    constructor: str = "waypoints",
+):
+    """
+    Generator version of slice that yields points as soon as the first cluster is
+    traced. Clusters are visited in centroid order and each one is only traced once
+    the points of the previous one have been consumed. Between paths the pen walks
+    back along the last path to its point nearest the next one and jumps across.
+    """
+
+    clusters = cluster_skeleton(skeleton)
+    topologies = cluster_topologies(clusters, topology)
+
+    prev_graph = None
+    prev_path = None
+
+    for index in centroid_order(clusters) if clusters else []:
+        cluster = clusters[index]
+
+        graph = build_pixel_graph(cluster, compact=compact)
+        path = trace_cluster(
+            graph,
+            cluster,
+            screen,
+            search,
+            topology=topologies[index],
+            constructor=constructor,
+        )
+
+        if not path:
+            continue
+
+        count("paths")
+
+        if prev_path is not None:
+            _, nearest_a, nearest_b = pair_distance(
+                [np.array(prev_path), np.array(path)], {}, 0, 1
+            )
+
+            sp = shortest_graph_path_coords(
+                prev_graph, prev_path[-1], nearest_a, screen, search
+            )
+            if sp:
+                yield from sp
+
+            yield nearest_b
+
+        yield from path
+
+        prev_graph = graph
+        prev_path = path
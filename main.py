@@ -1,45 +1,159 @@
+import asyncio
 import pygame
 import time
 
-from lib.serial_com import initialize, send_path
-from lib.skeleton import gen_skel
-from lib.render import PygameRecord
-from lib.slicer import slice
+from lib import instrument
+from lib.cache import PathCache, cache_key, cache_stream, pipeline_params
+from lib.plotter import STEP_VELOCITY, Plotter
+from lib.serial_async import plot_path
+from lib.serial_com import initialize, send_path, send_path_windowed
+from lib.simplify import simplify, simplify_stream
+from lib.skeleton import gen_skel, save_skeleton
+from lib.render import PygameRecord, render_preview
+from lib.slicer import slice, slice_stream
 import config
 
-path = config.image_path
 
-name = path.split("/")[-1].split(".")[0]
-output = config.output_path or f"output/{name}_skel.png"
-
-screen = None
-if config.display:
-    pygame.init()
-    screen = pygame.display.set_mode((480, 480))
-
-path = slice(
-    gen_skel(path, output),
-    screen if config.debug else None,
-)
-
-# output bounds are [0, 4]
-for i in range(len(path)):
-    path[i] = (path[i][0] / 120.0, path[i][1] / 120.0)
-
-path = path[::1]
-
-recorder = PygameRecord("output/skel.gif", 1000)
-
-if config.display and screen is not None:
+def main():
+    if config.profile:
+        instrument.enable(memory=config.profile_memory)
+    else:
+        instrument.enable_from_env()
+
+    try:
+        run()
+    finally:
+        report = instrument.disable()
+        if report is not None:
+            instrument.write_report(report, config.profile_output)
+
+
+def run():
+    path = config.image_path
+
+    name = path.split("/")[-1].split(".")[0]
+    output = config.output_path or f"output/{name}_skel.png"
+
+    screen = None
+    if config.display:
+        pygame.init()
+        screen = pygame.display.set_mode((480, 480))
+
+    options = {
+        "compact": config.compact_graph,
+        "search": config.graph_search,
+        "path_graph": config.path_graph,
+        "topology": config.graph_topology,
+        "constructor": config.path_constructor,
+    }
+
+    cache = None
+    cached = None
+    if config.cache_dir is not None:
+        with instrument.timer("cache"):
+            cache = PathCache(config.cache_dir, int(config.cache_max_mb * 2**20))
+            # Streaming only changes the order clusters are visited in, so it stays
+            # out of the key and entries sliced by batch.py are served here too
+            key = cache_key(path, pipeline_params(**options))
+            cached = cache.get(key)
+
+    if cached is not None:
+        skeleton, path = cached
+        save_skeleton(skeleton, output)
+    elif config.stream_slicing:
+        skeleton = gen_skel(path, output)
+        path = slice_stream(
+            skeleton,
+            screen if config.debug else None,
+            compact=config.compact_graph,
+            search=config.graph_search,
+            topology=config.graph_topology,
+            constructor=config.path_constructor,
+        )
+
+        if cache is not None:
+            path = cache_stream(path, cache, key, skeleton)
+    else:
+        skeleton = gen_skel(path, output)
+        path = slice(
+            skeleton,
+            screen if config.debug else None,
+            workers=config.slice_workers,
+            **options,
+        )
+
+        if cache is not None:
+            cache.put(key, skeleton, path)
+
+    # output bounds are [0, 4], scaled lazily so streamed points pass straight through
+    path = ((x / 120.0, y / 120.0) for x, y in path)
+
+    if config.stream_slicing and cached is None:
+        if config.simplify_tolerance is not None:
+            path = simplify_stream(path, config.simplify_tolerance)
+    else:
+        path = plan_path(list(path))
+
+    recorder = PygameRecord("output/skel.gif", 1000)
+
+    if config.display and screen is not None:
+        render(screen, path, recorder)
+    elif config.render_output is not None:
+        with instrument.timer("render_preview"):
+            render_preview(path, config.render_output, config.render_points_per_frame)
+    elif config.serial_async:
+        with instrument.timer("send_path"):
+            asyncio.run(plot_path("/dev/serial0", path, config.serial_protocol))
+    else:
+        with instrument.timer("send_path"):
+            ser = initialize("/dev/serial0")
+
+            if config.serial_protocol == "windowed":
+                send_path_windowed(ser, "/dev/serial0", path)
+            else:
+                send_path(ser, "/dev/serial0", path)
+
+
+def plan_path(points):
+    """
+    Simplify a path in plotter units when configured, reporting its estimated
+    plot time before and after.
+    """
+
+    plotter = Plotter(
+        max_velocity=config.plot_max_velocity or STEP_VELOCITY,
+        max_acceleration=config.plot_max_acceleration,
+        protocol=config.serial_protocol,
+    )
+
+    estimate = plotter.estimate(points)
+    print(format_estimate(estimate))
+
+    if config.simplify_tolerance is not None:
+        points = simplify(points, config.simplify_tolerance).tolist()
+        print(f"Simplified: {format_estimate(plotter.estimate(points))}")
+
+    return points
+
+
+def format_estimate(estimate):
+    return (
+        f"{estimate['points']} points, estimated plot time {estimate['time_s']:.0f}s "
+        f"({estimate['move_s']:.0f}s moving), travel {estimate['travel']:.1f} "
+        f"units of which {estimate['retrace']:.1f} retrace"
+    )
+
+
+@instrument.timed()
+def render(screen, path, recorder):
     screen.fill((0, 0, 0))
 
     last = (0, 0)
-    for i in range(len(path)):
+    for i, (x, y) in enumerate(path):
         # Color over last point
         if i > 0:
             pygame.draw.circle(screen, (255, 0, 0), last, 2)
 
-        x, y = path[i]
         pygame.draw.line(screen, (255, 0, 0), last, (y * 120, x * 120), 2)
         last = (y * 120, x * 120)
 
@@ -60,6 +174,8 @@ if config.display and screen is not None:
             pass
 
     pygame.quit()
-else:
-    ser = initialize("/dev/serial0")
-    send_path(ser, "/dev/serial0", path)
+
+
+# Slicing workers re-import this module, so only run the pipeline when executed
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,11 @@
 
 #include "motor.h"
 #include "target.h"
+#include "protocol.h"
+
+// 1 for the windowed binary protocol (lib/protocol.py, send_path_windowed), 0 for
+// one ASCII point per READY handshake (send_path)
+#define WINDOWED_PROTOCOL 0
 
 #define WRAPVAL 5000
 #define CLKDIV 25.0f
@@ -61,6 +66,25 @@ void core1_main()
         current_time = time_us_32();
     }
 
+#if WINDOWED_PROTOCOL
+    while (true)
+    {
+        protocol_poll();
+
+        // When the motor hits its target position, move on to the next buffered point
+        if (motor_x.current_position == motor_x.target_position && motor_y.current_position == motor_y.target_position)
+        {
+            Point point;
+
+            if (ring_pop(&point))
+            {
+                set_target_position(&motor_x, &motor_y, point.x, point.y);
+            }
+        }
+
+        protocol_report_free();
+    }
+#else
     while (true)
     {
         // bool left_motor_reached_mid = false;
@@ -111,6 +135,7 @@ void core1_main()
             set_target_position(&motor_x, &motor_y, x, y);
         }
     }
+#endif
 }
 
 // Main (runs on core 0)
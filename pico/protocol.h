@@ -0,0 +1,256 @@
+#pragma once
+
+#include "pico/stdlib.h"
+#include "hardware/uart.h"
+#include <stdint.h>
+
+// Windowed binary protocol, framing shared with lib/protocol.py
+//
+// Host to Pico, a batch of points:
+//   SYNC 'P' seq:u16 count:u8 count * (x:i16 y:i16) checksum:u16
+// Host to Pico on every (re)connect, the seq of the next batch it will send, with
+// resume 0 to start a new path or 1 to continue one after acks may have been lost:
+//   SYNC 'R' seq:u16 resume:u16 checksum:u16
+// Pico to host, an ack of every batch up to seq with the ring buffer's free slots,
+// or a nak asking for everything from seq to be resent:
+//   SYNC 'A' seq:u16 free:u16 checksum:u16
+//   SYNC 'N' seq:u16 free:u16 checksum:u16
+//
+// Integers are little endian and the checksum is CRC-16/CCITT (polynomial 0x1021,
+// initial value 0xFFFF) over every byte after SYNC
+#define PROTOCOL_SYNC 0xA5
+#define PROTOCOL_POINTS 'P'
+#define PROTOCOL_RESET 'R'
+#define PROTOCOL_ACK 'A'
+#define PROTOCOL_NAK 'N'
+
+#define RING_POINTS 256
+#define MAX_BATCH_POINTS 32
+
+// Points are fixed point with 12 fractional bits
+#define FIXED_POINT_SCALE 4096.0f
+
+#define MAX_FRAME_SIZE (5 + 4 * MAX_BATCH_POINTS + 2)
+
+typedef struct
+{
+    float x;
+    float y;
+} Point;
+
+// Only core 1 touches the ring, so no locking is needed
+Point ring[RING_POINTS];
+uint16_t ring_head = 0; // Next slot to write
+uint16_t ring_size = 0;
+
+uint8_t frame[MAX_FRAME_SIZE];
+uint16_t frame_length = 0;
+
+uint16_t expected_seq = 0;
+bool nak_sent = false;
+
+// Whether a host has started a path since boot
+bool started = false;
+
+// Free slots last reported to the host
+uint16_t reported_free = RING_POINTS;
+
+uint16_t crc16(const uint8_t *data, uint16_t length)
+{
+    uint16_t crc = 0xFFFF;
+
+    for (uint16_t i = 0; i < length; i++)
+    {
+        crc ^= data[i] << 8;
+
+        for (int bit = 0; bit < 8; bit++)
+        {
+            crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+        }
+    }
+
+    return crc;
+}
+
+uint16_t ring_free()
+{
+    return RING_POINTS - ring_size;
+}
+
+bool ring_pop(Point *point)
+{
+    if (ring_size == 0)
+    {
+        return false;
+    }
+
+    *point = ring[(ring_head + RING_POINTS - ring_size) % RING_POINTS];
+    ring_size--;
+
+    return true;
+}
+
+void send_ack(uint8_t kind, uint16_t seq)
+{
+    uint8_t ack[8] = {PROTOCOL_SYNC, kind, seq & 0xFF, seq >> 8, ring_free() & 0xFF, ring_free() >> 8};
+
+    uint16_t checksum = crc16(ack + 1, 5);
+    ack[6] = checksum & 0xFF;
+    ack[7] = checksum >> 8;
+
+    uart_write_blocking(uart0, ack, sizeof(ack));
+
+    reported_free = ring_free();
+}
+
+// Size of the frame in the buffer, or 0 if not enough of it has arrived yet
+uint16_t frame_size()
+{
+    if (frame_length >= 2 && frame[1] == PROTOCOL_RESET)
+    {
+        return 8;
+    }
+
+    if (frame_length < 5)
+    {
+        return 0;
+    }
+
+    return 5 + 4 * frame[4] + 2;
+}
+
+void handle_frame()
+{
+    uint16_t seq = frame[2] | (frame[3] << 8);
+    uint8_t count = frame[4];
+
+    // The host (re)connected. When resuming, frames from seq on may already be in
+    // the ring with their acks lost, so keep counting from the last one accepted
+    // unless this is the first path since boot
+    if (frame[1] == PROTOCOL_RESET)
+    {
+        bool resume = frame[4] | frame[5];
+        if (!resume || !started || (uint16_t)(seq - expected_seq) < 0x8000)
+        {
+            expected_seq = seq;
+        }
+        started = true;
+        nak_sent = false;
+        send_ack(PROTOCOL_ACK, expected_seq - 1);
+        return;
+    }
+
+    if (seq != expected_seq)
+    {
+        if ((uint16_t)(expected_seq - seq) < 0x8000)
+        {
+            // Already accepted, the ack was lost so send it again
+            send_ack(PROTOCOL_ACK, expected_seq - 1);
+        }
+        else if (!nak_sent)
+        {
+            // A frame was lost, ask for everything from it once
+            send_ack(PROTOCOL_NAK, expected_seq);
+            nak_sent = true;
+        }
+        return;
+    }
+
+    // The host never sends more than the free slots it was told about, so a full
+    // ring means a stale credit, drop the frame and let the host resend it
+    if (ring_free() < count)
+    {
+        return;
+    }
+
+    for (uint8_t i = 0; i < count; i++)
+    {
+        const uint8_t *p = frame + 5 + 4 * i;
+        int16_t x = p[0] | (p[1] << 8);
+        int16_t y = p[2] | (p[3] << 8);
+
+        ring[ring_head] = (Point){x / FIXED_POINT_SCALE, y / FIXED_POINT_SCALE};
+        ring_head = (ring_head + 1) % RING_POINTS;
+        ring_size++;
+    }
+
+    send_ack(PROTOCOL_ACK, seq);
+    expected_seq = seq + 1;
+    nak_sent = false;
+}
+
+// Drop the first byte of the buffer and resync on the next SYNC byte
+void resync()
+{
+    uint16_t start = 1;
+    while (start < frame_length && frame[start] != PROTOCOL_SYNC)
+    {
+        start++;
+    }
+
+    for (uint16_t i = start; i < frame_length; i++)
+    {
+        frame[i - start] = frame[i];
+    }
+    frame_length -= start;
+}
+
+// Feed every byte waiting on the UART into the frame parser without blocking
+void protocol_poll()
+{
+    while (uart_is_readable(uart0))
+    {
+        uint8_t byte = uart_getc(uart0);
+
+        if (frame_length == 0 && byte != PROTOCOL_SYNC)
+        {
+            continue;
+        }
+        frame[frame_length++] = byte;
+
+        while (frame_length > 0)
+        {
+            if (frame_length >= 2 && frame[1] != PROTOCOL_POINTS && frame[1] != PROTOCOL_RESET)
+            {
+                resync();
+                continue;
+            }
+
+            if (frame_length >= 5 && frame[1] == PROTOCOL_POINTS && (frame[4] == 0 || frame[4] > MAX_BATCH_POINTS))
+            {
+                resync();
+                continue;
+            }
+
+            uint16_t size = frame_size();
+            if (size == 0 || frame_length < size)
+            {
+                break;
+            }
+
+            uint16_t checksum = frame[size - 2] | (frame[size - 1] << 8);
+            if (crc16(frame + 1, size - 3) != checksum)
+            {
+                if (!nak_sent)
+                {
+                    send_ack(PROTOCOL_NAK, expected_seq);
+                    nak_sent = true;
+                }
+                resync();
+                continue;
+            }
+
+            handle_frame();
+            frame_length = 0;
+        }
+    }
+}
+
+// Tell the host about freed slots once a batch worth has drained from the ring
+void protocol_report_free()
+{
+    if (ring_free() >= reported_free + MAX_BATCH_POINTS)
+    {
+        send_ack(PROTOCOL_ACK, expected_seq - 1);
+    }
+}
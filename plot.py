@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from batch import slice_image
+from lib.serial_async import plot_jobs
+from lib.simplify import simplify
+import config
+
+
+def prepare_image(file_path, output_dir):
+    """
+    Skeletonize and slice one image as batch.py does, returning its simplified
+    path in plotter units.
+    """
+
+    entry = slice_image(file_path, output_dir)
+    if "error" in entry:
+        raise RuntimeError(f"Slicing {file_path} failed: {entry['error']}")
+
+    with open(entry["path"]) as f:
+        points = [tuple(map(float, line.split(","))) for line in f]
+
+    if config.simplify_tolerance is not None:
+        points = simplify(points, config.simplify_tolerance).tolist()
+
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Plot images one after another, slicing the next image while "
+        "the current one plots."
+    )
+    parser.add_argument("images", nargs="+", help="input images, plotted in order")
+    parser.add_argument("-o", "--output", default="output", help="output directory")
+    parser.add_argument("-p", "--port", default="/dev/serial0", help="serial port")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+
+    # Slicing runs in its own process so it never holds the GIL the sender needs
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        asyncio.run(
+            plot_jobs(
+                args.port,
+                args.images,
+                functools.partial(prepare_image, output_dir=args.output),
+                config.serial_protocol,
+                executor,
+            )
+        )
+
+
+# Workers re-import this module, so only plot when executed
+if __name__ == "__main__":
+    main()